@@ -12,7 +12,7 @@ import numpy as np
 
 
 def solve_aggregator_model(input_excel_file=None, input_data=None, performance_csv_file=None, training_data_csv_file=None, trust_region=True,
-                          output_excel_file=None, model="auto", alg=None, solver="gurobi", time_limit=300, verbose=1):
+                          output_excel_file=None, model="auto", alg=None, solver="gurobi", time_limit=300, solver_options=None, warm_start=None, verbose=1):
     """
     Solve the aggregator optimization problem with embedded regression model.
     Automatically detects whether to use monopoly or competition model based on input data.
@@ -44,6 +44,10 @@ def solve_aggregator_model(input_excel_file=None, input_data=None, performance_c
         Solver to use (default: "gurobi").
     time_limit: int
         Time limit in seconds (default: 300).
+    solver_options: dict, optional
+        Additional solver options, e.g. {"Threads": 1} for Gurobi (default: None).
+    warm_start: dict, optional
+        Charging prices {station: price} of a previous solution, used as a MIP start (default: None).
     verbose: int
         Verbosity level (0=silent, 1=basic, 2=detailed).
 
@@ -85,16 +89,16 @@ def solve_aggregator_model(input_excel_file=None, input_data=None, performance_c
         return solve_competition_model(input_data=input_data, performance_csv_file=performance_csv_file, 
                                      training_data_csv_file=training_data_csv_file, 
                                      trust_region=trust_region, output_excel_file=output_excel_file, 
-                                     alg=alg, solver=solver, time_limit=time_limit, verbose=verbose)
+                                     alg=alg, solver=solver, time_limit=time_limit, solver_options=solver_options, warm_start=warm_start, verbose=verbose)
     else:
         return solve_monopoly_model(input_data=input_data, performance_csv_file=performance_csv_file, 
                                   training_data_csv_file=training_data_csv_file, 
                                   trust_region=trust_region, output_excel_file=output_excel_file, 
-                                  alg=alg, solver=solver, time_limit=time_limit, verbose=verbose)
+                                  alg=alg, solver=solver, time_limit=time_limit, solver_options=solver_options, warm_start=warm_start, verbose=verbose)
 
 
 def solve_monopoly_model(input_data, performance_csv_file, training_data_csv_file, trust_region=True,
-                        output_excel_file=None, alg=None, solver="gurobi", time_limit=300, verbose=1):
+                        output_excel_file=None, alg=None, solver="gurobi", time_limit=300, solver_options=None, warm_start=None, verbose=1):
     """
     Solve the monopoly aggregator optimization problem with embedded regression model.
     (Original model that optimizes all stations)
@@ -117,6 +121,10 @@ def solve_monopoly_model(input_data, performance_csv_file, training_data_csv_fil
         Solver to use (default: "gurobi").
     time_limit: int
         Time limit in seconds (default: 300).
+    solver_options: dict, optional
+        Additional solver options, e.g. {"Threads": 1} for Gurobi (default: None).
+    warm_start: dict, optional
+        Charging prices {station: price} of a previous solution, used as a MIP start (default: None).
     verbose: int
         Verbosity level (0=silent, 1=basic, 2=detailed).
 
@@ -221,11 +229,25 @@ def solve_monopoly_model(input_data, performance_csv_file, training_data_csv_fil
         print(f"Solving with {solver}...")
     
     opt = SolverFactory(solver)
-    time_limit_option = {"cbc": "seconds", "gurobi": "timeLimit", "glpk": "tmlim", "cplex": "timelimit"}
+    time_limit_option = {"cbc": "seconds", "gurobi": "timeLimit", "gurobi_direct": "TimeLimit", "glpk": "tmlim", "cplex": "timelimit"}
     if solver in time_limit_option:
         opt.options[time_limit_option[solver]] = time_limit
+    if solver_options:
+        for option, value in solver_options.items():
+            opt.options[option] = value
+
+    # Use the prices of a previous solution as a MIP start if the solver supports it
+    solve_kwargs = {}
+    if warm_start and opt.warm_start_capable():
+        for station, price in warm_start.items():
+            var_name = f'rc_{station}'
+            if price is not None and var_name in final_model.x:
+                final_model.x[var_name].value = price
+        solve_kwargs['warmstart'] = True
+        if verbose >= 1:
+            print("Using warm start from previous solution")
 
-    results = opt.solve(final_model, tee=(verbose >= 2))
+    results = opt.solve(final_model, tee=(verbose >= 2), **solve_kwargs)
 
     # Process results
     if results.solver.status not in [pyo.SolverStatus.ok, pyo.SolverStatus.aborted]:
@@ -281,7 +303,7 @@ def solve_monopoly_model(input_data, performance_csv_file, training_data_csv_fil
 
 
 def solve_competition_model(input_data, performance_csv_file, training_data_csv_file, trust_region=True,
-                           output_excel_file=None, alg=None, solver="gurobi", time_limit=300, verbose=1):
+                           output_excel_file=None, alg=None, solver="gurobi", time_limit=300, solver_options=None, warm_start=None, verbose=1):
     """
     Solve the competition aggregator optimization problem with embedded regression models.
     (New model that optimizes only aggregator-controlled stations against fixed competitor prices)
@@ -304,6 +326,10 @@ def solve_competition_model(input_data, performance_csv_file, training_data_csv_
         Solver to use (default: "gurobi").
     time_limit: int
         Time limit in seconds (default: 300).
+    solver_options: dict, optional
+        Additional solver options, e.g. {"Threads": 1} for Gurobi (default: None).
+    warm_start: dict, optional
+        Charging prices {station: price} of a previous solution, used as a MIP start (default: None).
     verbose: int
         Verbosity level (0=silent, 1=basic, 2=detailed).
 
@@ -447,11 +473,25 @@ def solve_competition_model(input_data, performance_csv_file, training_data_csv_
         print(f"Solving with {solver}...")
     
     opt = SolverFactory(solver)
-    time_limit_option = {"cbc": "seconds", "gurobi": "timeLimit", "glpk": "tmlim", "cplex": "timelimit"}
+    time_limit_option = {"cbc": "seconds", "gurobi": "timeLimit", "gurobi_direct": "TimeLimit", "glpk": "tmlim", "cplex": "timelimit"}
     if solver in time_limit_option:
         opt.options[time_limit_option[solver]] = time_limit
+    if solver_options:
+        for option, value in solver_options.items():
+            opt.options[option] = value
+
+    # Use the prices of a previous solution as a MIP start if the solver supports it
+    solve_kwargs = {}
+    if warm_start and opt.warm_start_capable():
+        for station, price in warm_start.items():
+            var_name = f'rc_{station}'
+            if price is not None and var_name in final_model.x:
+                final_model.x[var_name].value = price
+        solve_kwargs['warmstart'] = True
+        if verbose >= 1:
+            print("Using warm start from previous solution")
 
-    results = opt.solve(final_model, tee=(verbose >= 2))
+    results = opt.solve(final_model, tee=(verbose >= 2), **solve_kwargs)
 
     # Process results
     if results.solver.status not in [pyo.SolverStatus.ok, pyo.SolverStatus.aborted]:
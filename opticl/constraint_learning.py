@@ -271,39 +271,72 @@ class ConstraintLearning(object):
             constraint['intercept'] = self.__learner.intercept_[0]
         return constraint
 
+    def __parents_skTree(self, children_left, children_right):
+        '''
+        This function returns the parent of every node (-1 for the root) and whether the node is its parent's left child,
+        read directly from the tree arrays instead of searching the path from the root for each leaf
+        '''
+        parent = np.full(len(children_left), -1, dtype=np.int64)
+        is_left = np.zeros(len(children_left), dtype=bool)
+        internal = np.flatnonzero(children_left != -1)
+        parent[children_left[internal]] = internal
+        parent[children_right[internal]] = internal
+        is_left[children_left[internal]] = True
+        return parent, is_left
+
     def constraint_extrapolation_skRF(self, class_c):
-        columns = ['Tree_id', 'ID'] + [feature for feature in self.get_features_list()] + ['threshold', 'prediction']
-        constraint_list = []
+        features_list = self.get_features_list()
+        columns = ['Tree_id', 'ID'] + [feature for feature in features_list] + ['threshold', 'prediction']
+        tree_ids, ids, coefficients, thresholds, predictions = [], [], [], [], []
         for tree_id, tree in enumerate(self.__learner):
-            children_left = tree.tree_.children_left
-            children_right = tree.tree_.children_right
             feature = tree.tree_.feature
             threshold = tree.tree_.threshold
+            value = tree.tree_.value
+            parent, is_left = self.__parents_skTree(tree.tree_.children_left, tree.tree_.children_right)
 
             # Leaves
             leave_id = tree.apply(self.__data.values)
 
             for i, leaf in enumerate(np.unique(leave_id)):
-                path_leaf = []
-                self.__find_path_skTree(0, path_leaf, leaf, children_left, children_right)
-                constraints_leaf = self.__get_rule_skTree(leaf, path_leaf, self.get_features_list(), columns[:-1], i + 1, class_c, children_left, feature, threshold)
-                constraints_leaf['Tree_id'] = tree_id
+                # Walk up from the leaf and reverse to get the split nodes from the root down
+                path_nodes, path_left = [], []
+                node = leaf
+                while parent[node] != -1:
+                    path_nodes.append(parent[node])
+                    path_left.append(is_left[node])
+                    node = parent[node]
+                if not path_nodes:
+                    continue
+                path_nodes = np.array(path_nodes[::-1])
+                path_left = np.array(path_left[::-1])
+
+                # Under the threshold: x <= t; over the threshold: -x <= -(t + eps)
+                coefficient = np.zeros((len(path_nodes), len(features_list)))
+                coefficient[np.arange(len(path_nodes)), feature[path_nodes]] = np.where(path_left, 1, -1)
+                coefficients.append(coefficient)
+                thresholds.append(np.where(path_left, threshold[path_nodes], -(threshold[path_nodes] + 0.000001)))
+                tree_ids.append(np.full(len(path_nodes), tree_id))
+                ids.append(np.full(len(path_nodes), i + 1))
+
                 if class_c == 'continuous':
-                    constraints_leaf['prediction'] = tree.tree_.value[leaf].item()
+                    prediction = value[leaf].item()
                 elif class_c == 'binary':
-                    constraints_leaf['prediction'] = float(tree.tree_.value[leaf][0, 1]/sum(tree.tree_.value[leaf][0]))
-                    # constraints_leaf['prediction'] = np.round(self.__learner.tree_.value[leaf].item())
-                elif class_c == 'multiclass':
+                    prediction = float(value[leaf][0, 1]/sum(value[leaf][0]))
+                    # prediction = np.round(self.__learner.tree_.value[leaf].item())
+                else:
                     # for i, class_name in enumerate(columns_classes):
                     #     constraints_leaf[class_name] = self.__learner.tree_.value[leaf][0, i]/sum(tree.tree_.value[leaf][0])
                     print('Under Development')
-                if not constraints_leaf.empty:
-                    constraint_list.append(constraints_leaf)
-
-        if constraint_list:
-            constraints = pd.concat(constraint_list, ignore_index=True)
-        else:
-            constraints = pd.DataFrame(columns=columns)
+                    prediction = np.nan
+                predictions.append(np.full(len(path_nodes), prediction))
+
+        if not coefficients:
+            return pd.DataFrame(columns=columns)
+        constraints = pd.DataFrame(np.concatenate(coefficients), columns=features_list)
+        constraints.insert(0, 'ID', np.concatenate(ids))
+        constraints.insert(0, 'Tree_id', np.concatenate(tree_ids))
+        constraints['threshold'] = np.concatenate(thresholds)
+        constraints['prediction'] = np.concatenate(predictions)
         return constraints
 
     def constraint_extrapolation_skGBM(self, class_c):
@@ -1,4 +1,4 @@
-from .get_routing_map_data import load_excel_map_data, filter_map_data_for_ev, extract_electricity_costs
+from .get_routing_map_data import load_excel_map_data, apply_charging_prices, filter_map_data_for_ev, extract_electricity_costs
 from .solve_routing_model import solve_for_one_ev, solve_for_all_evs
 from .save_ev_solution_data import create_solution_map
 from .compute_profit import compute_profit, compute_profit_stations, compute_scenario_profit
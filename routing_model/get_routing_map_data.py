@@ -57,24 +57,6 @@ def load_excel_map_data(file_path: str, charging_prices: dict = None, verbose: i
     # Clean the index names in unindexed_df
     unindexed_df.index = [clean_column_name(idx) for idx in unindexed_df.index]
 
-    # Override charging prices if provided
-    if charging_prices is not None:
-        # Create a mapping from charging station intersection to row index
-        station_to_index = {}
-        for idx, row in charging_stations_df.iterrows():
-            station_intersection = row['pStationIntersection']
-            station_to_index[station_intersection] = idx
-        
-        # Update charging prices for stations in the dictionary
-        for station, price in charging_prices.items():
-            if station in station_to_index:
-                row_idx = station_to_index[station]
-                charging_stations_df.loc[row_idx, 'pChargingPrice'] = price
-                if verbose >= 1:
-                    print(f"Updated charging price for station {station} to {price}")
-            else:
-                print(f"Warning: Charging station {station} not found in data, skipping price update")
-
     # Extract list of unique EVs from delivery points
     evs = sorted(delivery_points_df["EV"].unique().tolist())
 
@@ -90,9 +72,51 @@ def load_excel_map_data(file_path: str, charging_prices: dict = None, verbose: i
         'evs': evs
     }
 
+    # Override charging prices if provided
+    if charging_prices is not None:
+        map_data = apply_charging_prices(map_data, charging_prices, verbose=verbose)
+
     return map_data
 
 
+def apply_charging_prices(map_data: dict, charging_prices: dict, verbose: int = 0) -> dict:
+    """
+    Return a copy of the map data with the pChargingPrice values overridden.
+    Only the charging stations dataframe is copied, so a map loaded once can be reused for many price vectors.
+
+    Parameters
+    ----------
+    map_data: dict
+        The raw map data returned by load_excel_map_data().
+    charging_prices: dict
+        Dictionary with format {charging_station: charging_price} to override
+        the pChargingPrice values of the map data.
+    verbose: int
+        Verbosity level.
+
+    Returns
+    -------
+    map_data: dict
+        A new map data dictionary sharing every dataframe except charging_stations_df.
+    """
+    charging_stations_df = map_data['charging_stations_df'].copy()
+
+    # Create a mapping from charging station intersection to row index
+    station_to_index = dict(zip(charging_stations_df['pStationIntersection'], charging_stations_df.index))
+
+    # Update charging prices for stations in the dictionary
+    for station, price in charging_prices.items():
+        if station in station_to_index:
+            row_idx = station_to_index[station]
+            charging_stations_df.loc[row_idx, 'pChargingPrice'] = price
+            if verbose >= 1:
+                print(f"Updated charging price for station {station} to {price}")
+        else:
+            print(f"Warning: Charging station {station} not found in data, skipping price update")
+
+    return {**map_data, 'charging_stations_df': charging_stations_df}
+
+
 def extract_electricity_costs(map_data: dict) -> dict:
     """
     Extract electricity costs from map data in the format expected by regression models.
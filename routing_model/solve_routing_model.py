@@ -8,8 +8,21 @@ from pyomo.opt import SolverFactory
 import os
 
 
+# Abstract routing models built so far in this process, keyed by linearize_constraints;
+# create_instance does not modify the abstract model, so one is enough for every EV and price vector
+_abstract_models = {}
+
+
+def _get_abstract_model(linearize_constraints):
+    """Build the abstract routing model once per constraint type and reuse it afterwards."""
+    if linearize_constraints not in _abstract_models:
+        _abstract_models[linearize_constraints] = get_ev_routing_abstract_model(linearize_constraints=linearize_constraints)
+    return _abstract_models[linearize_constraints]
+
+
 def solve_for_one_ev(map_data, ev, output_excel_file=None, output_image_file=None, model_prefix=None, solver="gurobi",
-                     time_limit=300, verbose=1, linearize_constraints=False, tuned_params_file=None, load_if_exists=False):
+                     time_limit=300, verbose=1, linearize_constraints=False, tuned_params_file=None, load_if_exists=False,
+                     solver_options=None):
     """
     Solve the EV routing problem for a single EV.
 
@@ -25,6 +38,7 @@ def solve_for_one_ev(map_data, ev, output_excel_file=None, output_image_file=Non
         linearize_constraints: Whether to use linearized constraints (default: False)
         tuned_params_file: Path to tuned parameters file (.prm) for Gurobi (optional)
         load_if_exists: Whether to load existing solution from Excel file if it exists (default: False)
+        solver_options: Additional solver options, e.g. {"Threads": 1} for Gurobi (optional)
 
     Returns:
         Dictionary with solution results
@@ -89,7 +103,7 @@ def solve_for_one_ev(map_data, ev, output_excel_file=None, output_image_file=Non
     if verbose >= 1:
         constraint_type = "linearized" if linearize_constraints else "quadratic"
         print(f"Creating abstract routing_model for EV {ev} with {constraint_type} constraints...")
-    abstract_model = get_ev_routing_abstract_model(linearize_constraints=linearize_constraints)
+    abstract_model = _get_abstract_model(linearize_constraints)
 
     # Create a concrete instance using the data
     if verbose >= 1:
@@ -124,14 +138,14 @@ def solve_for_one_ev(map_data, ev, output_excel_file=None, output_image_file=Non
     opt = SolverFactory(solver)
 
     # Set time limit based on solver
-    time_limit_option = {"cbc": "seconds", "gurobi": "timeLimit", "glpk": "tmlim", "cplex": "timelimit"}
+    time_limit_option = {"cbc": "seconds", "gurobi": "timeLimit", "gurobi_direct": "TimeLimit", "glpk": "tmlim", "cplex": "timelimit"}
     if solver in time_limit_option:
         opt.options[time_limit_option[solver]] = time_limit
         if verbose >= 2:
             print(f"Time limit set to {time_limit} seconds")
 
     # Load tuned parameters for Gurobi if provided
-    if tuned_params_file and solver == "gurobi":
+    if tuned_params_file and solver in ("gurobi", "gurobi_direct"):
         if os.path.exists(tuned_params_file):
             if verbose >= 1:
                 print(f"Loading tuned parameters from {tuned_params_file}...")
@@ -168,6 +182,13 @@ def solve_for_one_ev(map_data, ev, output_excel_file=None, output_image_file=Non
             if verbose >= 1:
                 print(f"Warning: Tuned parameters file not found: {tuned_params_file}")
 
+    # Apply any additional solver options
+    if solver_options:
+        for option, value in solver_options.items():
+            opt.options[option] = value
+            if verbose >= 2:
+                print(f"Solver option {option} set to {value}")
+
     # Solve the routing_model
     if verbose >= 1:
         print(f"Solving the routing_model for EV {ev}...")
@@ -276,7 +297,8 @@ def solve_for_one_ev(map_data, ev, output_excel_file=None, output_image_file=Non
 
 
 def solve_for_all_evs(map_data, output_prefix_solution=None, output_prefix_image=None, model_prefix=None, solver="gurobi", time_limit=300, verbose=1,
-                      linearize_constraints=False, tuned_params_file=None, load_if_exists=False):
+                      linearize_constraints=False, tuned_params_file=None, load_if_exists=False,
+                      solver_options=None):
     """
     Solve the EV routing problem for all EVs in the dataset.
 
@@ -291,6 +313,7 @@ def solve_for_all_evs(map_data, output_prefix_solution=None, output_prefix_image
         linearize_constraints: Whether to use linearized constraints (default: False)
         tuned_params_file: Path to tuned parameters file (.prm) for Gurobi (optional)
         load_if_exists: Whether to load existing solutions from Excel files if they exist (default: False)
+        solver_options: Additional solver options passed to every EV solve (optional)
 
     Returns:
         Dictionary with results for all EVs
@@ -331,7 +354,8 @@ def solve_for_all_evs(map_data, output_prefix_solution=None, output_prefix_image
             verbose=verbose,
             linearize_constraints=linearize_constraints,
             tuned_params_file=tuned_params_file,
-            load_if_exists=load_if_exists
+            load_if_exists=load_if_exists,
+            solver_options=solver_options
         )
 
         all_results[ev] = ev_results
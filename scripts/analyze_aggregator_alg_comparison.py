@@ -21,6 +21,9 @@ import sys
 from datetime import datetime
 from utils.tee_output import TeeOutput
 
+# Algorithms compared, in plotting order
+ALGORITHMS = ['linear', 'rf', 'svm', 'cart', 'gbm', 'mlp']
+
 
 def load_and_preprocess_data(csv_file):
     """Load and preprocess the algorithm comparison CSV file."""
@@ -31,6 +34,15 @@ def load_and_preprocess_data(csv_file):
     df = pd.read_csv(csv_file)
     print(f"  → Loaded {len(df)} rows")
     
+    # Single-station combinations solved analytically (at the best price bound) have one 'analytical' row
+    # instead of the rows of each algorithm: count it as the real profit of every algorithm that ran (there is no prediction)
+    analytical = df['type'] == 'analytical'
+    if analytical.any():
+        algorithms = [t[:-len('_real')] for t in df['type'].unique() if t.endswith('_real')]
+        analytical_rows = [df[analytical].assign(type=f'{alg}_real') for alg in algorithms]
+        df = pd.concat([df[~analytical]] + analytical_rows, ignore_index=True)
+        print(f"  → Expanded {analytical.sum()} analytical rows into real profits of every algorithm")
+    
     # Add number of controlled stations
     df['num_controlled'] = df['controlled_stations'].apply(
         lambda x: len(x.split('|')) if '|' in str(x) else 1
@@ -71,7 +83,7 @@ def create_profit_by_stations_plot(df, output_file):
     
     # Get real profits for each algorithm and base case
     profit_data = []
-    algorithms = ['linear', 'rf', 'svm', 'cart', 'gbm', 'mlp']
+    algorithms = ALGORITHMS
     
     for combination in df['controlled_stations'].unique():
         combo_data = df[df['controlled_stations'] == combination]
@@ -152,33 +164,19 @@ def create_improvement_over_baseline_plot(profit_df, output_file):
     """Create improvement over base case plot."""
     print("Creating Profit Improvement over Base Case plot...")
     
-    # Calculate improvements for each combination
-    improvements = []
-    algorithms = ['linear', 'rf', 'svm', 'cart', 'gbm', 'mlp']
-    
-    for combination in profit_df['combination'].unique():
-        combo_data = profit_df[profit_df['combination'] == combination]
-        
-        base_case_profit = combo_data[combo_data['algorithm'] == 'base_case']['profit'].values
-        if len(base_case_profit) > 0:
-            base_profit = base_case_profit[0]
-            num_controlled = combo_data['num_controlled'].iloc[0]
-            
-            for alg in algorithms:
-                alg_profit = combo_data[combo_data['algorithm'] == alg]['profit'].values
-                if len(alg_profit) > 0:
-                    improvement = alg_profit[0] - base_profit
-                    improvement_pct = (alg_profit[0] - base_profit) / base_profit * 100 if base_profit != 0 else None
-                    
-                    improvements.append({
-                        'combination': combination,
-                        'algorithm': alg,
-                        'improvement': improvement,
-                        'improvement_pct': improvement_pct,
-                        'num_controlled': num_controlled
-                    })
+    # Calculate improvements for each combination, joining every algorithm row with its combination's base case
+    algorithms = ALGORITHMS
     
-    imp_df = pd.DataFrame(improvements)
+    base_profits = (profit_df[profit_df['algorithm'] == 'base_case']
+                    .drop_duplicates('combination')[['combination', 'profit']]
+                    .rename(columns={'profit': 'base_profit'}))
+    imp_df = (profit_df[profit_df['algorithm'].isin(algorithms)]
+              .drop_duplicates(['combination', 'algorithm'])
+              .merge(base_profits, on='combination'))
+    imp_df['improvement'] = imp_df['profit'] - imp_df['base_profit']
+    # Percentage is undefined (NaN) when the base case profit is zero
+    imp_df['improvement_pct'] = (imp_df['improvement'] / imp_df['base_profit'] * 100).where(imp_df['base_profit'] != 0)
+    imp_df = imp_df[['combination', 'algorithm', 'improvement', 'improvement_pct', 'num_controlled']]
     
     if imp_df.empty:
         print("  → No improvement data available")
@@ -258,7 +256,7 @@ def create_prediction_accuracy_plot(df, output_file):
     
     # Get prediction vs real data
     pred_real_data = []
-    algorithms = ['linear', 'rf', 'svm', 'cart', 'gbm', 'mlp']
+    algorithms = ALGORITHMS
     
     for combination in df['controlled_stations'].unique():
         combo_data = df[df['controlled_stations'] == combination]
@@ -402,7 +400,7 @@ def print_summary_statistics(profit_df, imp_df, pred_real_df, aggregator_r2, agg
     print("\n1. PROFIT COMPARISON BY ALGORITHM")
     print("-" * 50)
     
-    algorithms = ['linear', 'rf', 'svm', 'cart', 'gbm', 'mlp']
+    algorithms = ALGORITHMS
     
     if not profit_df.empty:
         for alg in ['base_case'] + algorithms:
@@ -18,12 +18,9 @@ The script was modified to ensure feasibility in the embedded constraints
 import pandas as pd
 import numpy as np
 import math
-from sklearn.utils.extmath import cartesian
 import time
 import sys
 import os
-import time
-import itertools
 
 # %%
 import opticl
@@ -76,10 +73,11 @@ task_type = 'continuous' # we are considering a regression problem
 # %%
 seed = 1
 
-# Create results directory if it doesn't exist
-if not os.path.exists('results'):
-    os.makedirs('results')
+# Create results directories if they don't exist
+for alg in alg_list:
+    os.makedirs('results/%s/' % alg, exist_ok=True)
 
+all_perf = []
 for outcome in outcome_list:
     print('Running models for outcome: %s' % outcome)
     for alg in alg_list:
@@ -96,8 +94,6 @@ for outcome in outcome_list:
                                     save = False)
         
         ## Save model for relevant ConstraintLearning class
-        if not os.path.exists('results/%s/' % alg):
-            os.makedirs('results/%s/' % alg)
         constraintL = opticl.ConstraintLearning(X_train, y_train, m, alg)
         constraint_add = constraintL.constraint_extrapolation(task_type)
         constraint_add.to_csv(model_save, index = False)
@@ -107,11 +103,10 @@ for outcome in outcome_list:
         perf['outcome'] = outcome
         perf['alg'] = alg
         perf.to_csv('results/%s/%s_%s_performance.csv' % (alg, version, outcome), index= False)
+        all_perf.append(perf)
 
 # %%
-perf_files = ['results/%s/%s_%s_performance.csv' % (x[0], version, x[1]) 
-              for x in itertools.product(alg_list, outcome_list)]
-performance = pd.concat(pd.read_csv(x) for x in perf_files)
+performance = pd.concat(all_perf, ignore_index=True)
 performance.to_csv('results/%s_performance.csv' % version, index = False)
 
 # %% [markdown]
@@ -203,6 +198,9 @@ if test_results.solver.termination_condition == TerminationCondition.optimal:
     print("Base model is feasible!")
 else:
     print("Base model is infeasible - issue with domain constraints")
+# Discard the values of the test solve so they are not carried into the final model
+for index in N:
+    model_pyo.x[index].value = None
 
 # %%
 final_model_pyo = opticl.optimization_MIP(model_pyo, model_pyo.x, model_master, X_train, tr = True)
@@ -210,7 +208,14 @@ final_model_pyo = opticl.optimization_MIP(model_pyo, model_pyo.x, model_master,
 
 # %%
 opt = SolverFactory('gurobi')
-results = opt.solve(final_model_pyo) 
+# Use every core with the concurrent root LP and favour finding feasible solutions
+opt.options['Threads'] = os.cpu_count()
+opt.options['Method'] = 3
+opt.options['MIPFocus'] = 1
+# Distributed MIP requires a Gurobi Compute Server license, e.g. GUROBI_WORKER_POOL='host1:port,host2:port'
+if os.environ.get('GUROBI_WORKER_POOL'):
+    opt.options['WorkerPool'] = os.environ['GUROBI_WORKER_POOL']
+results = opt.solve(final_model_pyo)
 
 print(f"Final optimization termination condition: {results.solver.termination_condition}")
 print(f"Solver status: {results.solver.status}")
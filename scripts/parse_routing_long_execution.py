@@ -179,24 +179,23 @@ def create_analysis_plot(input_file: str, output_file: str,
             print(f"Warning: No valid data for Scenario {scenario}, EV {ev} after filtering for log scale")
             continue
         
-        # Plot upper bound on primary y-axis
-        label_incumbent = f'S{scenario}-EV{ev} Upper Bound'
-        ax1.plot(time_filtered, incumbent_filtered, color=color, linewidth=2, 
-                label=label_incumbent, linestyle='-', alpha=0.8)
-        
         # Find the point with the best (lowest) upper bound for this section
         best_bound_idx = np.argmin(incumbent_filtered)
         best_bound_value = incumbent_filtered[best_bound_idx]
         best_bound_time = time_filtered[best_bound_idx]
         
+        # Plot upper bound on primary y-axis
+        label_incumbent = f'S{scenario}-EV{ev} Upper Bound'
+        ax1.plot(time_filtered, incumbent_filtered, color=color, linewidth=2, 
+                label=label_incumbent, linestyle='-', alpha=0.8)
+        
         # Mark the best upper bound point
         ax1.plot(best_bound_time, best_bound_value, 'o', color=color, markersize=6, 
                 markeredgecolor='black', markeredgewidth=1)
         
-        # Add label next to the line (at the middle of the line)
-        mid_idx = len(time_filtered) // 2
+        # Add label next to the best upper bound point
         ax1.annotate(f'S{scenario}-EV{ev}', 
-                    xy=(time_filtered[mid_idx], incumbent_filtered[mid_idx]),
+                    xy=(best_bound_time, best_bound_value),
                     xytext=(5, 5), textcoords='offset points',
                     fontsize=14, color=color, fontweight='bold',
                     bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.7))
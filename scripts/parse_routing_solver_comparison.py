@@ -1,260 +1,302 @@
 import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
 import numpy as np
 from pathlib import Path
 import re
-from typing import Dict, List, Tuple, Optional
+import logging
+import pickle
+from typing import Dict, Iterable, List, Tuple, Optional
 from datetime import datetime
 
-def parse_solver_output_by_sections(content: str) -> Dict[Tuple[str, str, int, int], Tuple[List[float], List[float]]]:
+log = logging.getLogger(__name__)
+
+# Patterns used while scanning the solver log, compiled once at import time
+# Section boundaries: either a main header (solver/constraints/scenario) or the start of an EV
+_BOUNDARY_RE = re.compile(r'EV Routing Solver Output - Solver (?P<solver>\w+), Constraints (?P<constraints>\w+), Scenario (?P<scenario>\d+)'
+                          r'|Processing EV (?P<ev>\d+)')
+_ELAPSED_RE = re.compile(r'Elapsed time = (\d+\.\d+) sec')
+
+# Stored in the parse cache; increase it whenever the parsing changes so cached results are discarded
+_PARSE_CACHE_VERSION = 1
+
+def parse_solver_output_by_sections(lines: Iterable[str]) -> Dict[Tuple[str, str, int, int], Tuple[List[float], List[float]]]:
     """
     Parse the output of different solvers (Gurobi Linear, Gurobi Quadratic, CPLEX Linear)
     by sections (solver, constraints, scenario, EV) to get the incumbent values and time stamps.
+    The lines are consumed one at a time, so an open file can be passed without reading it into memory.
     """
     
     # Dictionary to store data for each (solver, constraints, scenario, EV) tuple
     sections_data = {}
     
-    # Split content by lines and look for section headers
-    lines = content.split('\n')
+    # Look for section headers line by line
     current_main_section = None  # (solver, constraints, scenario)
     current_ev = None
-    current_ev_data = []
+    parser = None
+    feed = None
+    
+    def store_current_ev():
+        # Store the data parsed for the current EV (if any) and reset the parser
+        incumbent_values, time_values = parser.finalize()
+        if incumbent_values:
+            section_key = (current_main_section[0], current_main_section[1], current_main_section[2], current_ev)
+            sections_data[section_key] = (incumbent_values, time_values)
+            print(f"  Found {len(incumbent_values)} data points for {current_main_section[0]} {current_main_section[1]} S{current_main_section[2]} EV{current_ev}")
     
     print("Parsing file content...")
     section_count = 0
     
-    i = 0
-    while i < len(lines):
-        line = lines[i]
+    for line in lines:
+        line = line.rstrip('\n')
+        # Only header ('E...') and EV ('P...') lines can be section boundaries;
+        # a single combined regex classifies them in one match
+        c0 = line[:1]
+        boundary = _BOUNDARY_RE.match(line) if c0 == 'E' or c0 == 'P' else None
         
         # Look for main section header with solver, constraints, and scenario info
-        if line.startswith('EV Routing Solver Output - Solver'):
+        if boundary is not None and boundary.group('ev') is None:
             # Process any pending EV data first
-            if current_main_section is not None and current_ev is not None and current_ev_data:
-                incumbent_values, time_values = parse_section_data(current_ev_data, current_main_section[0])
-                if incumbent_values:
-                    section_key = (current_main_section[0], current_main_section[1], current_main_section[2], current_ev)
-                    sections_data[section_key] = (incumbent_values, time_values)
-                    print(f"  Found {len(incumbent_values)} data points for {current_main_section[0]} {current_main_section[1]} S{current_main_section[2]} EV{current_ev}")
+            if current_main_section is not None and current_ev is not None:
+                store_current_ev()
             
             # Extract solver, constraints, and scenario from header
-            header_match = re.search(r'EV Routing Solver Output - Solver (\w+), Constraints (\w+), Scenario (\d+)', line)
-            if header_match:
-                solver = header_match.group(1)
-                constraints = header_match.group(2)
-                scenario = int(header_match.group(3))
-                current_main_section = (solver, constraints, scenario)
-                current_ev = None
-                current_ev_data = []
-                section_count += 1
-                print(f"Found main section header: Solver {solver}, Constraints {constraints}, Scenario {scenario}")
-            else:
-                print(f"Warning: Could not parse header: {line}")
-                current_main_section = None
-                current_ev = None
-                current_ev_data = []
+            solver = boundary.group('solver')
+            constraints = boundary.group('constraints')
+            scenario = int(boundary.group('scenario'))
+            current_main_section = (solver, constraints, scenario)
+            current_ev = None
+            parser = make_section_parser(solver)
+            feed = parser.feed
+            section_count += 1
+            print(f"Found main section header: Solver {solver}, Constraints {constraints}, Scenario {scenario}")
         
-        elif line.startswith('Processing EV') and current_main_section is not None:
+        elif boundary is not None and current_main_section is not None:
             # Process any pending EV data first
-            if current_ev is not None and current_ev_data:
-                incumbent_values, time_values = parse_section_data(current_ev_data, current_main_section[0])
-                if incumbent_values:
-                    section_key = (current_main_section[0], current_main_section[1], current_main_section[2], current_ev)
-                    sections_data[section_key] = (incumbent_values, time_values)
-                    print(f"  Found {len(incumbent_values)} data points for {current_main_section[0]} {current_main_section[1]} S{current_main_section[2]} EV{current_ev}")
+            if current_ev is not None:
+                store_current_ev()
             
-            # Extract EV number and start collecting data for this EV
-            ev_match = re.search(r'Processing EV (\d+)', line)
-            if ev_match:
-                current_ev = int(ev_match.group(1))
-                current_ev_data = []
-                print(f"  Starting EV {current_ev} data collection")
+            # Start parsing data for this EV
+            current_ev = int(boundary.group('ev'))
+            print(f"  Starting EV {current_ev} data collection")
         
-        else:
-            # Add line to current EV data if we're processing an EV within a section
+        elif c0 == 'E' and line.startswith('EV Routing Solver Output - Solver'):
+            # Header-like line that the boundary regex could not parse
             if current_main_section is not None and current_ev is not None:
-                current_ev_data.append(line)
+                store_current_ev()
+            print(f"Warning: Could not parse header: {line}")
+            current_main_section = None
+            current_ev = None
+            parser = None
         
-        i += 1
+        else:
+            # Parse the line on the fly if we're processing an EV within a section
+            if current_main_section is not None and current_ev is not None:
+                feed(line)
     
     # Don't forget the last EV data
-    if current_main_section is not None and current_ev is not None and current_ev_data:
-        incumbent_values, time_values = parse_section_data(current_ev_data, current_main_section[0])
-        if incumbent_values:
-            section_key = (current_main_section[0], current_main_section[1], current_main_section[2], current_ev)
-            sections_data[section_key] = (incumbent_values, time_values)
-            print(f"  Found {len(incumbent_values)} data points for {current_main_section[0]} {current_main_section[1]} S{current_main_section[2]} EV{current_ev}")
+    if current_main_section is not None and current_ev is not None:
+        store_current_ev()
     
     print(f"Total main sections found: {section_count}")
     print(f"EV sections with data: {len(sections_data)}")
     
     return sections_data
 
-def parse_section_data(section_lines: List[str], solver: str) -> Tuple[List[float], List[float]]:
+class SectionParser:
     """
-    Parse the data lines for a single EV section to extract incumbent and time values.
+    Streaming parser for the data lines of a single EV section.
+    Lines are fed one at a time and only the incumbent and time values found so far are kept.
     """
-    incumbent_values = []
-    time_values = []
     
-    if solver.lower() == 'gurobi':
-        # Parse Gurobi output format
-        in_optimization_table = False
-        
-        for line in section_lines:
-            # Check if we're entering the optimization table
-            if 'Nodes    |    Current Node    |     Objective Bounds' in line:
-                in_optimization_table = True
-                continue
-            elif line.startswith('Cutting planes:') or line.startswith('Explored'):
-                in_optimization_table = False
-                continue
-            
-            if not in_optimization_table:
-                continue
-                
-            # Look for lines with incumbent values in the optimization table
-            # Pattern: H/*/nodes have incumbent, then 0.00000, then 100%, then time
-            # Also regular node lines: nodes nodes status depth incumbent 0.00000 100% iter time
-            if line.strip() and not line.startswith('-') and not line.startswith('|'):
-                values = line.split()
-                
-                # Must end with time (ending with 's') and have enough columns
-                if len(values) >= 5 and values[-1].endswith('s'):
-                    try:
-                        time_val = float(values[-1].replace('s', ''))
-                        
-                        # Find incumbent: look for the first decimal number > 0 that's not 0.00000
-                        # and is followed by 0.00000 (best bound) and 100% (gap)
-                        incumbent = None
-                        
-                        for i in range(len(values) - 3):  # Need space for incumbent, bestbound, gap
-                            try:
-                                val = float(values[i])
-                                # Check if this looks like incumbent followed by bestbound and gap
-                                if (val > 0 and '.' in values[i] and values[i] != '0.00000' and
-                                    i + 2 < len(values) and 
-                                    values[i + 1] == '0.00000' and 
-                                    values[i + 2].endswith('%')):
-                                    incumbent = val
-                                    break
-                            except ValueError:
-                                continue
-                        
-                        if incumbent is not None:
-                            incumbent_values.append(incumbent)
-                            time_values.append(time_val)
-                            print(f"Debug - Gurobi parsing: Found incumbent={incumbent}, time={time_val} from line: {line[:100]}")
-                        
-                    except (ValueError, IndexError):
-                        continue
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        """
+        Reset the parser state to start a new EV section.
+        """
+        self.in_optimization_table = False
+        self.elapsed_time = 0.0
+        self.incumbent_values = []
+        self.time_values = []
+    
+    def feed(self, line: str):
+        """
+        Parse a single line of the section. Lines of unknown solvers carry no incumbent data.
+        """
+        return
     
-    elif solver.lower() == 'cplex':
-        # Parse CPLEX output format
-        elapsed_time = 0.0
-        in_optimization_table = False
+    def finalize(self) -> Tuple[List[float], List[float]]:
+        """
+        Return the filtered incumbent and time values of the section and reset the parser.
+        """
+        result = filter_incumbent_data(self.incumbent_values, self.time_values)
+        self.reset()
+        return result
+
+class GurobiSectionParser(SectionParser):
+    """
+    Section parser for the Gurobi optimization table.
+    """
+    
+    def feed(self, line: str):
+        # Parse Gurobi output format
+        # Check if we're entering the optimization table
+        if 'Nodes    |    Current Node    |     Objective Bounds' in line:
+            self.in_optimization_table = True
+            return
+        elif line.startswith(('Cutting planes:', 'Explored')):
+            self.in_optimization_table = False
+            return
         
-        for line in section_lines:
-            # Look for elapsed time information
-            if 'Elapsed time =' in line:
-                time_match = re.search(r'Elapsed time = (\d+\.\d+) sec', line)
-                if time_match:
-                    elapsed_time = float(time_match.group(1))
-                    continue
+        if not self.in_optimization_table:
+            return
             
-            # Check if we're entering the optimization table
-            if 'Node  Left     Objective  IInf  Best Integer    Best Bound' in line:
-                in_optimization_table = True
-                continue
-            elif line.strip().startswith('GUB cover cuts') or line.strip().startswith('Root node processing'):
-                in_optimization_table = False
-                continue
+        # Look for lines with incumbent values in the optimization table
+        # Pattern: H/*/nodes have incumbent, then 0.00000, then 100%, then time
+        # Also regular node lines: nodes nodes status depth incumbent 0.00000 100% iter time
+        if line.strip() and not line.startswith(('-', '|')):
+            # Only the trailing Incumbent/BestBd/Gap/It-Node/Time columns are needed;
+            # everything before them stays unsplit in values[0]
+            values = line.rsplit(None, 6)
             
-            # Look for lines with '*' (integer solution found) in CPLEX format
-            if line.strip().startswith('*') and len(line.split()) >= 4:
+            # Must end with time (ending with 's') and have enough columns
+            if len(values) >= 5 and values[-1].endswith('s'):
                 try:
-                    # Extract objective value from CPLEX format
-                    # CPLEX format variations: 
-                    # *     0+    0                          247.8695        0.0000           100.00%
-                    # * 10496+    0                          204.7155        0.0000           100.00%
+                    time_val = float(values[-1].replace('s', ''))
                     
-                    parts = line.split()
-                    obj_val = None
+                    # Find incumbent: anchor on the gap column (ending with '%') preceded by
+                    # 0.00000 (best bound); the incumbent is the decimal number just before them
+                    incumbent = None
                     
-                    # Look for the objective value (typically a decimal number that's not 0.0000 or 100.00%)
-                    for i, part in enumerate(parts[1:], 1):
-                        try:
-                            if '+' in part or part == '0' or part.startswith('0+'):
-                                continue  # Skip node indicators
-                            val = float(part)
-                            # Skip percentages, small bounds, and obviously wrong values
-                            if (val > 0.01 and val < 10000 and 
-                                not part.endswith('%') and '.' in part and 
-                                val != 0.0000):
-                                obj_val = val
-                                break
-                        except ValueError:
-                            continue
+                    for k in range(len(values) - 2, 2, -1):  # The time column follows the gap
+                        if values[k].endswith('%') and values[k - 1] == '0.00000':
+                            candidate = values[k - 2]
+                            if '.' in candidate and candidate != '0.00000':
+                                try:
+                                    val = float(candidate)
+                                except ValueError:
+                                    break
+                                if val > 0:
+                                    incumbent = val
+                            break
                     
-                    if obj_val is not None:
-                        incumbent_values.append(obj_val)
-                        # Use elapsed time if available, otherwise estimate based on position
-                        time_val = elapsed_time if elapsed_time > 0 else len(incumbent_values) * 0.5
-                        time_values.append(time_val)
-                        print(f"Debug - CPLEX parsing: Found incumbent={obj_val}, time={time_val} from line: {line[:80]}")
+                    if incumbent is not None:
+                        self.incumbent_values.append(incumbent)
+                        self.time_values.append(time_val)
+                        log.debug("Debug - Gurobi parsing: Found incumbent=%s, time=%s from line: %.100s", incumbent, time_val, line)
                     
                 except (ValueError, IndexError):
-                    continue
+                    return
+
+class CplexSectionParser(SectionParser):
+    """
+    Section parser for the CPLEX node log.
+    """
     
+    def feed(self, line: str):
+        # Parse CPLEX output format
+        # Look for elapsed time information
+        if 'Elapsed time =' in line:
+            time_match = _ELAPSED_RE.search(line)
+            if time_match:
+                self.elapsed_time = float(time_match.group(1))
+                return
+        
+        # Check if we're entering the optimization table
+        if 'Node  Left     Objective  IInf  Best Integer    Best Bound' in line:
+            self.in_optimization_table = True
+            return
+        
+        stripped = line.strip()
+        if stripped.startswith(('GUB cover cuts', 'Root node processing')):
+            self.in_optimization_table = False
+            return
+        
+        # Look for lines with '*' (integer solution found) in CPLEX format
+        if not stripped.startswith('*'):
+            return
+        # The objective sits within the first few fields; leave the rest unsplit
+        parts = line.split(None, 8)
+        if len(parts) >= 4:
+            try:
+                # Extract objective value from CPLEX format
+                # CPLEX format variations: 
+                # *     0+    0                          247.8695        0.0000           100.00%
+                # * 10496+    0                          204.7155        0.0000           100.00%
+                
+                obj_val = None
+                
+                # Look for the objective value (typically a decimal number that's not 0.0000 or 100.00%)
+                for i, part in enumerate(parts[1:], 1):
+                    # Only decimal, non-percentage tokens can hold the objective; test that
+                    # before float() so node counts and flags never raise
+                    if '.' not in part or part.endswith('%') or '+' in part:
+                        continue  # Skip node indicators
+                    try:
+                        val = float(part)
+                        # Skip small bounds and obviously wrong values
+                        if (val > 0.01 and val < 10000 and 
+                            val != 0.0000):
+                            obj_val = val
+                            break
+                    except ValueError:
+                        continue
+                
+                if obj_val is not None:
+                    self.incumbent_values.append(obj_val)
+                    # Use elapsed time if available, otherwise estimate based on position
+                    time_val = self.elapsed_time if self.elapsed_time > 0 else len(self.incumbent_values) * 0.5
+                    self.time_values.append(time_val)
+                    log.debug("Debug - CPLEX parsing: Found incumbent=%s, time=%s from line: %.80s", obj_val, time_val, line)
+                
+            except (ValueError, IndexError):
+                return
+
+# Parser class for each solver, looked up once per section
+_SECTION_PARSERS = {'gurobi': GurobiSectionParser, 'cplex': CplexSectionParser}
+
+def make_section_parser(solver: str) -> SectionParser:
+    """
+    Create the streaming section parser for the given solver.
+    """
+    return _SECTION_PARSERS.get(solver.lower(), SectionParser)()
+
+def filter_incumbent_data(incumbent_values: List[float], time_values: List[float]) -> Tuple[List[float], List[float]]:
+    """
+    Sort the incumbent values of a section by time, remove duplicates and keep only the
+    improving solutions plus some intermediate points for better visualization.
+    """
     # Clean up data - remove duplicates and sort by time
     if incumbent_values and time_values:
-        # Combine and sort by time
-        data_pairs = list(zip(time_values, incumbent_values))
-        data_pairs.sort()  # Sort by time
+        log.debug("Debug - Original data_pairs count: %d", min(len(incumbent_values), len(time_values)))
         
-        # Keep improving solutions and some intermediate points for better visualization
-        print(f"Debug - Original data_pairs count: {len(data_pairs)}")
+        # Remove exact (time, incumbent) duplicates in one pass, keeping the first occurrence in log order
+        unique_pairs = list(dict.fromkeys(zip(time_values, incumbent_values)))
+        t = np.fromiter((p[0] for p in unique_pairs), dtype=np.float64, count=len(unique_pairs))
+        y = np.fromiter((p[1] for p in unique_pairs), dtype=np.float64, count=len(unique_pairs))
         
-        if len(data_pairs) <= 1:
-            # Not enough data to filter meaningfully
-            if data_pairs:
-                time_values, incumbent_values = zip(*data_pairs)
-                return list(incumbent_values), list(time_values)
-            else:
-                return [], []
-        
-        # Sort by time and remove exact duplicates
-        unique_pairs = []
-        seen = set()
-        for time_val, incumbent in data_pairs:
-            pair_key = (time_val, incumbent)
-            if pair_key not in seen:
-                unique_pairs.append((time_val, incumbent))
-                seen.add(pair_key)
+        log.debug("Debug - After removing duplicates: %d points", len(t))
         
-        print(f"Debug - After removing duplicates: {len(unique_pairs)} points")
+        # Sort by time, keeping the log order of points reported within the same second
+        order = np.argsort(t, kind='stable')
+        t, y = t[order], y[order]
         
-        # Keep improving solutions plus some intermediate points
-        filtered_pairs = []
-        best_so_far = float('inf')
+        if len(t) <= 1:
+            # Not enough data to filter meaningfully
+            return y.tolist(), t.tolist()
         
-        for time_val, incumbent in unique_pairs:
-            # Keep if it's an improvement
-            if incumbent < best_so_far:
-                filtered_pairs.append((time_val, incumbent))
-                best_so_far = incumbent
-                print(f"Debug - Kept (improvement): time={time_val}, incumbent={incumbent}")
-            # Also keep some intermediate points for time progression (every 10th point or every 2+ seconds)
-            elif (len(filtered_pairs) > 0 and 
-                  (len(filtered_pairs) % 10 == 0 or time_val - filtered_pairs[-1][0] >= 2.0)):
-                filtered_pairs.append((time_val, incumbent))
-                print(f"Debug - Kept (intermediate): time={time_val}, incumbent={incumbent}")
+        # Keep improving solutions plus some intermediate points for time progression
+        # (every 10th point or after a gap of 2+ seconds)
+        run_min = np.minimum.accumulate(y)
+        improve_mask = np.concatenate(([True], y[1:] < run_min[:-1]))
+        intermediate_mask = (np.arange(len(t)) % 10 == 0) | (np.diff(t, prepend=-np.inf) >= 2.0)
+        final_mask = improve_mask | intermediate_mask
         
-        print(f"Debug - Final filtered pairs: {len(filtered_pairs)} points")
+        log.debug("Debug - Final filtered pairs: %d points", final_mask.sum())
         
-        if filtered_pairs:
-            time_values, incumbent_values = zip(*filtered_pairs)
-            return list(incumbent_values), list(time_values)
+        # Intermediate points report the best incumbent found so far
+        return run_min[final_mask].tolist(), t[final_mask].tolist()
     
     return [], []
 
@@ -264,74 +306,83 @@ def create_solver_comparison_plot(input_file: str, output_file: str):
     with separate lines for each solver type.
     """
     
-    # Read the input file
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except FileNotFoundError:
+    if not Path(input_file).exists():
         print(f"Error: File {input_file} not found.")
         return
-    except Exception as e:
-        print(f"Error reading file {input_file}: {e}")
-        return
     
-    # Parse the solver output by sections
+    # Reuse the sections parsed on a previous run if neither the log nor the parser has changed since
+    cache_file = Path(input_file + '.parsed.pkl')
+    sections_data = None
     try:
-        sections_data = parse_solver_output_by_sections(content)
+        if cache_file.exists() and cache_file.stat().st_mtime >= Path(input_file).stat().st_mtime:
+            cached = pickle.loads(cache_file.read_bytes())
+            if isinstance(cached, dict) and cached.get('version') == _PARSE_CACHE_VERSION:
+                sections_data = cached['sections']
+                print(f"Loaded parsed sections from cache {cache_file}")
     except Exception as e:
-        print(f"Error parsing solver output: {e}")
-        return
+        print(f"Warning: Could not read parse cache {cache_file} ({e}), parsing the log again")
+        sections_data = None
+    
+    # Read and parse the solver output by sections, streaming the input file
+    if sections_data is None:
+        try:
+            with open(input_file, 'r', encoding='utf-8') as f:
+                sections_data = parse_solver_output_by_sections(f)
+        except FileNotFoundError:
+            print(f"Error: File {input_file} not found.")
+            return
+        except Exception as e:
+            print(f"Error parsing solver output: {e}")
+            return
+        
+        try:
+            cached = {'version': _PARSE_CACHE_VERSION, 'sections': sections_data}
+            cache_file.write_bytes(pickle.dumps(cached, protocol=pickle.HIGHEST_PROTOCOL))
+        except OSError as e:
+            print(f"Warning: Could not write parse cache {cache_file} ({e})")
     
     if not sections_data:
         print("No data found in the solver output.")
         return
     
     # Organize data by scenario and EV
-    scenarios = [0, 1, 2]
-    evs = [1, 2, 3]
-    solvers = ['gurobi_linear', 'gurobi_quadratic', 'cplex_linear']
+    scenarios = (0, 1, 2)
+    evs = (1, 2, 3)
+    solvers = ('gurobi_linear', 'gurobi_quadratic', 'cplex_linear')
+    scenario_set, ev_set = frozenset(scenarios), frozenset(evs)
     
-    # Create organized data structure
-    organized_data = {}
-    for scenario in scenarios:
-        organized_data[scenario] = {}
-        for ev in evs:
-            organized_data[scenario][ev] = {}
-            for solver in solvers:
-                organized_data[scenario][ev][solver] = {'incumbent': [], 'time': []}
+    # Map each (solver, constraints) pair straight to its combined key
+    solver_keys = {tuple(solver.split('_', 1)): solver for solver in solvers}
     
-    # Fill organized data structure
+    # Store each parsed section as flat (time, incumbent) arrays keyed by (scenario, ev, solver)
+    arrays = {}
     for (solver, constraints, scenario, ev), (incumbent_values, time_values) in sections_data.items():
-        solver_key = f"{solver}_{constraints}"
-        if solver_key in solvers and scenario in scenarios and ev in evs:
-            organized_data[scenario][ev][solver_key]['incumbent'] = incumbent_values
-            organized_data[scenario][ev][solver_key]['time'] = time_values
+        solver_key = solver_keys.get((solver, constraints))
+        if solver_key is not None and scenario in scenario_set and ev in ev_set:
+            arrays[(scenario, ev, solver_key)] = (np.asarray(time_values, dtype=float),
+                                                  np.asarray(incumbent_values, dtype=float))
     
     # Find the maximum time across all data to ensure consistent x-axis range
-    max_time = 0
-    for scenario in scenarios:
-        for ev in evs:
-            for solver in solvers:
-                data = organized_data[scenario][ev][solver]
-                if data['time']:
-                    max_time = max(max_time, max(data['time']))
+    max_time = max((t[-1] for t, _ in arrays.values() if len(t)), default=0.0)
     
     print(f"Maximum time found across all data: {max_time:.2f} seconds")
     
-    # Extend all solver lines to the maximum time with their final best value
+    # Extend all solver lines to the maximum time with their final best value,
+    # recording (points, best value, first time, last time) per trace for the summary
+    stats = {}
     for scenario in scenarios:
         for ev in evs:
             for solver in solvers:
-                data = organized_data[scenario][ev][solver]
-                if data['incumbent'] and data['time']:
+                t, y = arrays.setdefault((scenario, ev, solver), (np.empty(0), np.empty(0)))
+                if len(t):
+                    stats[(scenario, ev, solver)] = (len(y), y.min(), t.min(), t.max())
                     # If the last time point is not at max_time, extend the line
-                    if data['time'][-1] < max_time - 0.01:  # Allow small tolerance for floating point comparison
+                    if t[-1] < max_time - 0.01:  # Allow small tolerance for floating point comparison
                         # Add final point at max_time with the last (best) incumbent value
                         # Use the last incumbent value rather than the minimum to preserve the solution trajectory
-                        final_incumbent = data['incumbent'][-1]
-                        data['incumbent'].append(final_incumbent)
-                        data['time'].append(max_time)
-                        print(f"Extended {solver} S{scenario} EV{ev} to time {max_time:.2f} with incumbent {final_incumbent:.4f}")
+                        arrays[(scenario, ev, solver)] = (np.append(t, max_time), np.append(y, y[-1]))
+                        stats[(scenario, ev, solver)] = (len(y) + 1, y.min(), t.min(), max_time)
+                        print(f"Extended {solver} S{scenario} EV{ev} to time {max_time:.2f} with incumbent {y[-1]:.4f}")
                 elif max_time > 0:
                     # If no data exists, create a placeholder line (this shouldn't happen with real data)
                     print(f"Warning: No data for {solver} S{scenario} EV{ev}, skipping extension")
@@ -344,7 +395,8 @@ def create_solver_comparison_plot(input_file: str, output_file: str):
     }
     
     # Create the plot
-    fig, axes = plt.subplots(3, 3, figsize=(18, 12))
+    # All subplots share the same time domain; y-axes stay independent for the log/linear choice
+    fig, axes = plt.subplots(3, 3, figsize=(18, 12), sharex=True)
     fig.suptitle(f'Solver Performance Comparison: Incumbent Values Over Time', fontsize=24, fontweight='bold')
     
     for i, scenario in enumerate(scenarios):
@@ -354,17 +406,19 @@ def create_solver_comparison_plot(input_file: str, output_file: str):
             # Plot data for each solver
             legend_added = False
             for solver in solvers:
-                data = organized_data[scenario][ev][solver]
-                if data['incumbent'] and data['time']:
-                    incumbent_values = data['incumbent']
-                    time_values = data['time']
+                time_values, incumbent_values = arrays[(scenario, ev, solver)]
+                if len(time_values):
+                    # Only improvements change a step plot; keep those plus the final (extended) point
+                    keep = np.ones(len(incumbent_values), dtype=bool)
+                    keep[1:-1] = np.diff(incumbent_values)[:-1] != 0
+                    time_values, incumbent_values = time_values[keep], incumbent_values[keep]
                     
                     # Plot the line with step-post style to show that values are held constant
                     solver_name = solver.replace('_', ' ').replace('gurobi', 'Gurobi').replace('cplex', 'CPLEX').title()
-                    ax.plot(time_values, incumbent_values, 
-                           color=colors[solver], linewidth=2, 
-                           label=solver_name, alpha=0.8, marker='o', markersize=3,
-                           drawstyle='steps-post')  # Step plot shows incumbent is held until next improvement
+                    ax.add_line(Line2D(time_values, incumbent_values, 
+                                       color=colors[solver], linewidth=2, 
+                                       label=solver_name, alpha=0.8, marker='o', markersize=3,
+                                       drawstyle='steps-post'))  # Step plot shows incumbent is held until next improvement
                     legend_added = True
             
             # Set subplot properties
@@ -374,22 +428,13 @@ def create_solver_comparison_plot(input_file: str, output_file: str):
             # Set tick label font sizes
             ax.tick_params(axis='both', which='major', labelsize=13)
             
-            # Set consistent x-axis limits across all subplots
-            if max_time > 0:
-                ax.set_xlim(0, max_time * 1.02)  # Add 2% padding
-            
             # Use log scale if we have a wide range of values
             if legend_added:
-                y_values = []
-                for solver in solvers:
-                    data = organized_data[scenario][ev][solver]
-                    if data['incumbent']:
-                        y_values.extend(data['incumbent'])
+                y_values = np.concatenate([y for _, y in (arrays[(scenario, ev, solver)] for solver in solvers) if y.size])
                 
                 # Check for log scale - avoid division by zero
-                if y_values and len(y_values) > 1:
-                    min_val = min(y_values)
-                    max_val = max(y_values)
+                if y_values.size > 1:
+                    min_val, max_val = y_values.min(), y_values.max()
                     
                     # Only use log scale if min value is positive and there's a significant range
                     if min_val > 0.001 and max_val / min_val > 10:
@@ -398,6 +443,10 @@ def create_solver_comparison_plot(input_file: str, output_file: str):
                     elif min_val <= 0:
                         print(f"Linear scale for Scenario {scenario}, EV {ev} (contains non-positive values: min={min_val})")
             
+            # Lines are added without autoscaling; compute the data limits once per subplot
+            ax.relim()
+            ax.autoscale_view()
+            
             # Only show x-axis label for bottom row
             if i == 2:
                 ax.set_xlabel('Time (seconds)', fontsize=17)
@@ -406,6 +455,10 @@ def create_solver_comparison_plot(input_file: str, output_file: str):
             if j == 0:
                 ax.set_ylabel('Incumbent Value', fontsize=17)
     
+    # Set consistent x-axis limits across all subplots (shared through sharex)
+    if max_time > 0:
+        axes[0, 0].set_xlim(0, max_time * 1.02)  # Add 2% padding
+    
     # Create a single legend for the entire figure
     # Get legend from the first subplot that has data
     handles, labels = [], []
@@ -436,11 +489,10 @@ def create_solver_comparison_plot(input_file: str, output_file: str):
         for ev in evs:
             print(f"Scenario {scenario}, EV {ev}:")
             for solver in solvers:
-                data = organized_data[scenario][ev][solver]
-                if data['incumbent']:
-                    best_value = min(data['incumbent'])
-                    time_range = f"{min(data['time']):.2f}s - {max(data['time']):.2f}s"
-                    print(f"  {solver.replace('_', ' ').title()}: {len(data['incumbent'])} points, best = {best_value:.4f}, time range = {time_range}")
+                if (scenario, ev, solver) in stats:
+                    n_points, best_value, t_min, t_max = stats[(scenario, ev, solver)]
+                    time_range = f"{t_min:.2f}s - {t_max:.2f}s"
+                    print(f"  {solver.replace('_', ' ').title()}: {n_points} points, best = {best_value:.4f}, time range = {time_range}")
                 else:
                     print(f"  {solver.replace('_', ' ').title()}: No data")
 
@@ -10,26 +10,42 @@ This script:
 """
 
 from aggregator_model import solve_aggregator_model, load_aggregator_excel_data
-from routing_model import load_excel_map_data, solve_for_all_evs, extract_electricity_costs
+from routing_model import load_excel_map_data, extract_electricity_costs
 from utils import (
     TeeOutput, 
     get_price_info, 
     create_aggregator_data, 
+    station_profits_array,
     get_controlled_profit,
+    fill_routing_prices,
+    set_map_data_template,
+    solve_routing_station_profits,
     solve_routing_and_get_profit,
-    generate_station_combinations
+    generate_station_combinations,
+    filter_combinations_by_baseline,
+    prune_combinations_by_surrogate,
+    print_combinations,
+    compute_algorithm_time_limits,
+    resume_results_csv,
+    stream_combination_results
 )
 import pandas as pd
 import numpy as np
 import os
-import sys
+import contextlib
 from datetime import datetime
 
 
 def run_experiment_for_combination(controlled_stations, base_case_prices, general_min_price, general_max_price,
                                  performance_csv_file, training_data_csv_file, base_map_file,
-                                 all_stations, base_case_station_profits, algorithms, solver="gurobi", time_limit=300, verbose=1):
-    """Run complete experiment for a specific combination of controlled stations."""
+                                 all_stations, base_case_station_profits, algorithms, solver="gurobi", time_limit=300, solver_options=None, routing_cache_dir=None, rc_keys=None,
+                                 analytical_single_station=False, algorithm_time_limits=None, warm_start_algorithms=False, verbose=1):
+    """
+    Run complete experiment for a specific combination of controlled stations.
+    algorithm_time_limits optionally overrides the aggregator time limit per algorithm ({alg: seconds}).
+    warm_start_algorithms seeds every algorithm's solve with the prices found by the first one
+    (faster, but then the algorithms are no longer compared independently).
+    """
     results = []
     
     if verbose >= 1:
@@ -47,7 +63,8 @@ def run_experiment_for_combination(controlled_stations, base_case_prices, genera
     if verbose >= 2:
         print(f"Price bounds: ${general_min_price:.3f} - ${general_max_price:.3f}")
         print(f"Controlled stations: {controlled_stations}")
-        print(f"Competitor stations: {[s for s in base_case_prices.keys() if s not in controlled_stations]}")
+        controlled_set = frozenset(controlled_stations)
+        print(f"Competitor stations: {[s for s in base_case_prices if s not in controlled_set]}")
     
     # Calculate base case profit from pre-computed results
     base_case_profit = get_controlled_profit(base_case_station_profits, controlled_stations)
@@ -56,16 +73,40 @@ def run_experiment_for_combination(controlled_stations, base_case_prices, genera
 
     # Store base case result
     controlled_stations_str = "|".join(map(str, controlled_stations))
-    base_case_result = {
-        'controlled_stations': controlled_stations_str,
-        'type': 'base_case',
-        'profit': base_case_profit
-    }
-    for station in all_stations:
-        base_case_result[f'rc_{station}'] = base_case_prices[station]
-    results.append(base_case_result)
+    if rc_keys is None:
+        rc_keys = [f'rc_{station}' for station in all_stations]
+    
+    def make_result(result_type, profit, prices):
+        # One CSV row: the fixed columns followed by the price of every station
+        result = {'controlled_stations': controlled_stations_str, 'type': result_type, 'profit': profit}
+        result.update(zip(rc_keys, [prices[station] for station in all_stations]))
+        return result
+    
+    results.append(make_result('base_case', base_case_profit, base_case_prices))
+    
+    # Optional fast path for a single controlled station: evaluate the routing model at both
+    # price bounds and keep the better one instead of solving the aggregator with every algorithm
+    if analytical_single_station and len(controlled_stations) == 1:
+        station = controlled_stations[0]
+        best_profit, best_prices = None, None
+        for bound_price in (general_min_price, general_max_price):
+            bound_prices = base_case_prices.copy()
+            bound_prices[station] = bound_price
+            bound_profit = solve_routing_and_get_profit(bound_prices, controlled_stations, base_map_file, solver, time_limit, max(0, verbose-1), solver_options, routing_cache_dir)
+            if verbose >= 1:
+                print(f"Profit at price ${bound_price:.3f}: " + (f"${bound_profit:.4f}" if bound_profit is not None else "N/A"))
+            if bound_profit is not None and (best_profit is None or bound_profit > best_profit):
+                best_profit, best_prices = bound_profit, bound_prices
+        
+        if best_prices is not None:
+            results.append(make_result('analytical', best_profit, best_prices))
+        return results
     
     # Test each algorithm
+    # With warm_start_algorithms, the first algorithm's solution warm-starts the solves of the following ones
+    warm_start = None
+    # Routing profit already evaluated for each price vector: {price signature: (algorithm, real profit)}
+    evaluated_prices = {}
     for alg in algorithms:
         if verbose >= 1:
             print()
@@ -75,9 +116,10 @@ def run_experiment_for_combination(controlled_stations, base_case_prices, genera
             print()
         
         # Solve aggregator model
+        alg_time_limit = time_limit if algorithm_time_limits is None else algorithm_time_limits.get(alg, time_limit)
         if verbose >= 2:
             print(f"\n{'=' * 40}")
-            print(f"Solving aggregator model with {alg}...")
+            print(f"Solving aggregator model with {alg} (time limit: {alg_time_limit:.1f} s)...")
             print(f"{'=' * 40}")
         
         agg_results = solve_aggregator_model(
@@ -88,12 +130,16 @@ def run_experiment_for_combination(controlled_stations, base_case_prices, genera
             alg=alg,
             model="competition",
             solver=solver,
-            time_limit=time_limit,
+            time_limit=alg_time_limit,
+            solver_options=solver_options,
+            warm_start=warm_start,
             verbose=max(0, verbose-1)
         )
         
         predicted_profit = agg_results['objective_value']
         solution_prices = agg_results['charging_prices']
+        if warm_start_algorithms and warm_start is None:
+            warm_start = solution_prices
         
         if verbose >= 2:
             print(f"Aggregator solver status: {agg_results.get('solver_status', 'unknown')}")
@@ -111,14 +157,7 @@ def run_experiment_for_combination(controlled_stations, base_case_prices, genera
                 print(f"Solution prices: {solution_str}")
         
         # Store predicted result
-        predicted_result = {
-            'controlled_stations': controlled_stations_str,
-            'type': f'{alg}_predicted',
-            'profit': predicted_profit
-        }
-        for station in all_stations:
-            predicted_result[f'rc_{station}'] = solution_prices[station]
-        results.append(predicted_result)
+        results.append(make_result(f'{alg}_predicted', predicted_profit, solution_prices))
         
         # Test solution against routing model
         if verbose >= 1:
@@ -126,33 +165,23 @@ def run_experiment_for_combination(controlled_stations, base_case_prices, genera
             print(f"Testing solution against routing model...")
             print(f"{'=' * 40}")
         
-        # Create a copy of solution_prices with None values replaced appropriately for routing model
-        routing_prices = {}
-        for station in all_stations:
-            price = solution_prices[station]
-            if price is None:
-                if station in controlled_stations:
-                    # For controlled stations, use minimum price if not set by optimizer
-                    routing_prices[station] = general_min_price
-                else:
-                    # For competitor stations, use their fixed price from base case
-                    routing_prices[station] = base_case_prices[station]
-            else:
-                routing_prices[station] = price
+        # Copy of solution_prices with None values replaced appropriately for routing model
+        routing_prices = fill_routing_prices(solution_prices, controlled_stations, base_case_prices, general_min_price)
         
-        real_profit = solve_routing_and_get_profit(routing_prices, controlled_stations, base_map_file, solver, time_limit, max(0, verbose-1))
+        # Algorithms that agree on the prices share the same routing solve
+        price_signature = tuple(sorted((station, round(price, 6)) for station, price in routing_prices.items()))
+        if price_signature in evaluated_prices:
+            same_alg, real_profit = evaluated_prices[price_signature]
+            if verbose >= 1:
+                print(f"Same prices as {same_alg} - reusing its routing profit")
+        else:
+            real_profit = solve_routing_and_get_profit(routing_prices, controlled_stations, base_map_file, solver, time_limit, max(0, verbose-1), solver_options, routing_cache_dir)
+            evaluated_prices[price_signature] = (alg, real_profit)
         if verbose >= 1:
-            print(f"Real profit: ${real_profit:.4f}")
+            print(f"Real profit: ${real_profit:.4f}" if real_profit is not None else "Real profit: N/A")
 
         # Store real result
-        real_result = {
-            'controlled_stations': controlled_stations_str,
-            'type': f'{alg}_real',
-            'profit': real_profit
-        }
-        for station in all_stations:
-            real_result[f'rc_{station}'] = solution_prices[station]
-        results.append(real_result)
+        results.append(make_result(f'{alg}_real', real_profit, solution_prices))
         
         if verbose >= 1:
             print(f"\n{'=' * 40}")
@@ -174,13 +203,51 @@ def run_experiment_for_combination(controlled_stations, base_case_prices, genera
 def main():
     """Main function to run all experiments."""
     # Configuration
-    solver = "gurobi"
+    # gurobi_direct solves in-process through gurobipy, reusing one environment per process (worker processes
+    # are spawned, so each starts its own), instead of writing an LP file and starting a new Gurobi process for every solve
+    solver = "gurobi_direct"
     time_limit = 15  # seconds
     verbose = 2  # 0=silent, 1=basic, 2=detailed
+    max_combinations_listed = 50  # combinations printed in the log before the sweep starts
+    
+    # Parallel execution: combinations are independent, so they run in separate processes,
+    # each solve limited to threads_per_solve threads to avoid oversubscribing the cores
+    # (set max_workers = 1 to run them one by one in this process, e.g. with a single-use Gurobi license)
+    threads_per_solve = 1
+    max_workers = max(1, (os.cpu_count() or 1) // threads_per_solve)
+    solver_options = {"Threads": threads_per_solve} if solver.startswith("gurobi") else None
+    
+    # Routing solves (including the base case) are cached on disk by map contents, solver settings and price vector,
+    # and reused across combinations and runs (None disables the disk cache)
+    routing_cache_dir = "../cache"
+    
+    # Optional surrogate pre-filter: skip combinations whose best profit in the training data does not beat
+    # their base case, and keep at most surrogate_topk of the rest (None disables the filter)
+    surrogate_topk = None
+    surrogate_epsilon = 0.0
+    
+    # Optional pre-filter: skip combinations whose stations earn less than this in the base case (None disables it)
+    min_baseline_profit = None
+    
+    # Continue an interrupted run: path of its results CSV, whose finished combinations are skipped (None starts a new one)
+    resume_csv_file = None
     
     # Available algorithms to test
     algorithms = ["linear", "rf", "svm", "cart", "gbm", "mlp"]
     
+    # Evaluate single-station combinations only at the price bounds instead of with every algorithm
+    # (assumes the best price of a lone station lies at a bound, so it is off by default)
+    analytical_single_station = False
+    
+    # Optional adaptive time budgets: share time_limit * len(algorithms) among the algorithms according to
+    # how much they improved over the base case in a previous results CSV (None keeps time_limit for all)
+    time_budget_history_csv = None
+    time_budget_temperature = 2.0  # softmax temperature on the standardized rewards (higher = more even split)
+    
+    # Warm-start every algorithm with the prices found by the first one (off by default, since the
+    # algorithms' solutions would then depend on the first algorithm's instead of being compared independently)
+    warm_start_algorithms = False
+    
     # Input files
     base_aggregator_file = "../data/37-intersection map Aggregator Competition.xlsx"
     base_map_file = "../data/37-intersection map.xlsx"
@@ -189,18 +256,15 @@ def main():
     
     # Output files
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_csv_file = f"../results/aggregator_37map_alg_comparison_{timestamp}.csv"
+    output_csv_file = resume_csv_file if resume_csv_file is not None else f"../results/aggregator_37map_alg_comparison_{timestamp}.csv"
     log_file_path = f"../logs/aggregator_37map_alg_comparison_{timestamp}.txt"
     
     # Create output directories if they don't exist
     os.makedirs(os.path.dirname(output_csv_file), exist_ok=True)
     os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
     
-    # Set up output redirection to save to log file
-    original_stdout = sys.stdout
-    sys.stdout = TeeOutput(log_file_path)
-    
-    try:
+    # Set up output redirection to save to log file (restored, and the log flushed and closed, on exit)
+    with TeeOutput(log_file_path) as tee_output, contextlib.redirect_stdout(tee_output):
         # Check if input files exist
         for file_path in [base_aggregator_file, base_map_file, performance_csv_file, training_data_csv_file]:
             if not os.path.exists(file_path):
@@ -213,6 +277,7 @@ def main():
         print(f"Solver: {solver}")
         print(f"Time limit: {time_limit} seconds")
         print(f"Verbosity level: {verbose}")
+        print(f"Parallel workers: {max_workers} ({threads_per_solve} solver thread(s) each)")
         print(f"Algorithms to test: {', '.join(algorithms)}")
         print(f"Output CSV: {output_csv_file}")
         print(f"Log file: {log_file_path}")
@@ -224,6 +289,8 @@ def main():
         base_aggregator_data = load_aggregator_excel_data(base_aggregator_file, verbose=0)
         print(f"→ Loading map data from: {base_map_file}")
         base_map_data = load_excel_map_data(base_map_file, verbose=0)
+        # Routing solves apply their prices to a copy of this data instead of re-reading the workbook
+        set_map_data_template(base_map_file, base_map_data)
         print(f"→ Extracting price information...")
         base_case_prices, general_min_price, general_max_price = get_price_info(base_aggregator_data, base_map_data)
         
@@ -234,77 +301,123 @@ def main():
         print(f"→ Price range: ${general_min_price:.3f} - ${general_max_price:.3f}")
         print()
         
+        # Adapt the aggregator time limit of each algorithm to its past improvements
+        algorithm_time_limits = None
+        if time_budget_history_csv is not None:
+            print(f"Computing per-algorithm time limits from: {time_budget_history_csv}")
+            algorithm_time_limits = compute_algorithm_time_limits(time_budget_history_csv, algorithms, time_limit,
+                                                                  temperature=time_budget_temperature)
+            skipped = [alg for alg in algorithms if alg not in algorithm_time_limits]
+            algorithms = list(algorithm_time_limits)
+            for alg, alg_time_limit in algorithm_time_limits.items():
+                print(f"→ {alg}: {alg_time_limit:.1f} seconds")
+            if skipped:
+                print(f"→ Skipping algorithms: {', '.join(skipped)}")
+            print()
+        
         # Generate combinations to test
         print("Generating station combinations...")
         combinations_to_test = generate_station_combinations(all_stations, min_size=1, max_size=5)
+        # Largest combinations (the slowest solves) first, so the small ones fill in the tail of the parallel run
+        combinations_to_test.sort(key=len, reverse=True)
         print(f"→ Testing {len(combinations_to_test)} combinations:")
-        for i, combo in enumerate(combinations_to_test, 1):
-            print(f"    {i:2d}. {combo}")
+        print_combinations(combinations_to_test, max_combinations_listed)
         print()
         
         # Run base case once for all combinations
         print("Running base case scenario (once for all combinations)...")
         print("=" * 80)
-        map_data = load_excel_map_data(base_map_file, charging_prices=base_case_prices, verbose=0)
-        base_case_results = solve_for_all_evs(
-            map_data,
-            solver=solver,
-            time_limit=time_limit,
-            verbose=max(0, verbose-1),
-            linearize_constraints=True
+        base_case_station_profits = solve_routing_station_profits(
+            base_case_prices, base_map_file, solver, time_limit, max(0, verbose-1),
+            cache_dir=routing_cache_dir
         )
         
-        if "station_profits" not in base_case_results or base_case_results["station_profits"] is None:
+        if base_case_station_profits is None:
             raise RuntimeError("Failed to solve base case - no station profits available")
         
-        base_case_station_profits = base_case_results["station_profits"]
+        # Dense array indexed by station id, so each combination's base profit is a single reduction
+        base_case_station_profits = station_profits_array(base_case_station_profits)
         print(f"✓ Base case solved successfully")
         print()
+        
+        if min_baseline_profit is not None:
+            print(f"Skipping combinations with base case profit below ${min_baseline_profit:.2f}...")
+            num_combinations = len(combinations_to_test)
+            combinations_to_test = filter_combinations_by_baseline(combinations_to_test, base_case_station_profits,
+                                                                   min_baseline_profit)
+            print(f"→ Kept {len(combinations_to_test)}/{num_combinations} combinations")
+            print()
+        
+        if surrogate_topk is not None:
+            print("Pruning combinations with the training data surrogate...")
+            num_combinations = len(combinations_to_test)
+            combinations_to_test, surrogates = prune_combinations_by_surrogate(
+                combinations_to_test, training_data_csv_file, base_case_station_profits,
+                general_min_price, general_max_price, topk=surrogate_topk, epsilon=surrogate_epsilon
+            )
+            print(f"→ Kept {len(combinations_to_test)}/{num_combinations} combinations:")
+            print_combinations(combinations_to_test, max_combinations_listed, surrogates)
+            print()
 
+        # CSV columns: fixed result columns followed by one price column per station
+        result_columns = ['controlled_stations', 'type', 'profit']
+        rc_keys = [f'rc_{station}' for station in all_stations]
+        
+        if resume_csv_file is not None:
+            print(f"Resuming from: {resume_csv_file}")
+            finished_combinations = resume_results_csv(resume_csv_file, result_columns + rc_keys)
+            num_combinations = len(combinations_to_test)
+            combinations_to_test = [combo for combo in combinations_to_test
+                                    if "|".join(map(str, combo)) not in finished_combinations]
+            print(f"→ Skipping {num_combinations - len(combinations_to_test)} finished combinations, {len(combinations_to_test)} left")
+            print()
+        
         # Run experiments
         print("Starting experiments...")
         print("=" * 80)
-        all_results = []
-        
-        for i, controlled_stations in enumerate(combinations_to_test):
-            print(f"\nPROGRESS: Combination {i+1}/{len(combinations_to_test)} - {controlled_stations}")
-            print(f"Remaining: {len(combinations_to_test) - i - 1} combinations")
-            
-            combo_results = run_experiment_for_combination(
-                controlled_stations=controlled_stations,
-                base_case_prices=base_case_prices,
-                general_min_price=general_min_price,
-                general_max_price=general_max_price,
-                performance_csv_file=performance_csv_file,
-                training_data_csv_file=training_data_csv_file,
-                base_map_file=base_map_file,
-                all_stations=all_stations,
-                base_case_station_profits=base_case_station_profits,
-                algorithms=algorithms,
-                solver=solver,
-                time_limit=time_limit,
-                verbose=verbose
-            )
-            
-            all_results.extend(combo_results)
-            print(f"✓ Completed combination {i+1}/{len(combinations_to_test)}")
+        combination_log_dir = os.path.splitext(log_file_path)[0] + "_combinations"
+        experiment_kwargs = dict(
+            base_case_prices=base_case_prices,
+            general_min_price=general_min_price,
+            general_max_price=general_max_price,
+            performance_csv_file=performance_csv_file,
+            training_data_csv_file=training_data_csv_file,
+            base_map_file=base_map_file,
+            all_stations=all_stations,
+            rc_keys=rc_keys,
+            base_case_station_profits=base_case_station_profits,
+            algorithms=algorithms,
+            solver=solver,
+            time_limit=time_limit,
+            solver_options=solver_options,
+            routing_cache_dir=routing_cache_dir,
+            analytical_single_station=analytical_single_station,
+            algorithm_time_limits=algorithm_time_limits,
+            warm_start_algorithms=warm_start_algorithms,
+            verbose=verbose
+        )
+        # Rows are streamed to the CSV as combinations complete, in combination order
+        # (when resuming, they are appended to the existing CSV, which already has its header)
+        rows_written = stream_combination_results(
+            run_experiment_for_combination, combinations_to_test, experiment_kwargs,
+            max_workers=max_workers, log_dir=combination_log_dir,
+            output_csv_file=output_csv_file, fieldnames=result_columns + rc_keys,
+            append=resume_csv_file is not None
+        )
         
-        # Create results DataFrame and save to CSV
-        if all_results:
+        # Summarize the saved results
+        if rows_written:
             print(f"\n{'='*80}")
             print("SAVING RESULTS")
             print(f"{'='*80}")
             
-            results_df = pd.DataFrame(all_results)
-            results_df.to_csv(output_csv_file, index=False)
-            
-            print(f"Total experiments completed: {len(all_results)}")
+            print(f"Total experiments completed: {rows_written}")
             print(f"Results saved to: {output_csv_file}")
             print(f"Log saved to: {log_file_path}")
             print()
-            print("Results preview:")
+            print("Results preview (last 20 rows):")
             print("-" * 80)
-            print(results_df.to_string(index=False))
+            print(pd.read_csv(output_csv_file).tail(20).to_string(index=False))
             print("-" * 80)
         else:
             print(f"\nERROR: No results generated!")
@@ -312,12 +425,6 @@ def main():
         print(f"\n{'='*80}")
         print("ALGORITHM COMPARISON COMPLETED")
         print(f"{'='*80}")
-        
-    finally:
-        # Restore original stdout
-        if hasattr(sys.stdout, 'close'):
-            sys.stdout.close()
-        sys.stdout = original_stdout
 
 
 if __name__ == "__main__":
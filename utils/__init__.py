@@ -2,7 +2,20 @@ from .tee_output import TeeOutput
 from .aggregator_experiments import (
     get_price_info,
     create_aggregator_data,
+    station_profits_array,
     get_controlled_profit,
+    fill_routing_prices,
+    clear_routing_cache,
+    set_map_data_template,
+    solve_routing_station_profits,
     solve_routing_and_get_profit,
-    generate_station_combinations
+    generate_station_combinations,
+    filter_combinations_by_baseline,
+    prune_combinations_by_surrogate,
+    print_combinations,
+    compute_algorithm_time_limits,
+    progress_file_path,
+    resume_results_csv,
+    run_combinations_in_parallel,
+    stream_combination_results
 )
@@ -8,17 +8,24 @@ This module contains functions that are common to both:
 
 import pandas as pd
 import numpy as np
-from itertools import combinations
-from routing_model import load_excel_map_data, solve_for_all_evs
+import os
+import csv
+import json
+import pickle
+import hashlib
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from itertools import combinations, islice
+from routing_model import load_excel_map_data, apply_charging_prices, solve_for_all_evs
 
 
 def get_price_info(base_aggregator_data, base_map_data):
     """Extract all price information needed for experiments."""
     # Base case prices from map data
-    base_case_prices = {}
-    for _, row in base_map_data['charging_stations_df'].iterrows():
-        station_id = int(row['pStationIntersection'])
-        base_case_prices[station_id] = row['pChargingPrice']
+    charging_stations_df = base_map_data['charging_stations_df']
+    base_case_prices = dict(zip(charging_stations_df['pStationIntersection'].astype(int).tolist(),
+                                charging_stations_df['pChargingPrice'].tolist()))
     
     # General min/max prices from aggregator data
     all_base_stations = base_aggregator_data[None]['sChargingStations'][None]
@@ -35,51 +42,172 @@ def get_price_info(base_aggregator_data, base_map_data):
 def create_aggregator_data(controlled_stations, base_case_prices, general_min_price, general_max_price):
     """Create synthetic aggregator instance data."""
     all_stations = list(base_case_prices.keys())
+    controlled_set = frozenset(controlled_stations)
     
+    # Controlled stations: set min/max bounds, nan for fixed price
+    # Competitor stations: set fixed prices, nan for min/max bounds
     synthetic_data = {None: {
         'sChargingStations': {None: all_stations},
-        'pMinChargingPrice': {},
-        'pMaxChargingPrice': {},
-        'pChargingPrice': {}
+        'pMinChargingPrice': {s: general_min_price if s in controlled_set else np.nan for s in all_stations},
+        'pMaxChargingPrice': {s: general_max_price if s in controlled_set else np.nan for s in all_stations},
+        'pChargingPrice': {s: np.nan if s in controlled_set else base_case_prices[s] for s in all_stations}
     }}
     
-    for station in all_stations:
-        if station in controlled_stations:
-            # Controlled stations: set min/max bounds, nan for fixed price
-            synthetic_data[None]['pMinChargingPrice'][station] = general_min_price
-            synthetic_data[None]['pMaxChargingPrice'][station] = general_max_price
-            synthetic_data[None]['pChargingPrice'][station] = np.nan
-        else:
-            # Competitor stations: set fixed prices, nan for min/max bounds
-            synthetic_data[None]['pMinChargingPrice'][station] = np.nan
-            synthetic_data[None]['pMaxChargingPrice'][station] = np.nan
-            synthetic_data[None]['pChargingPrice'][station] = base_case_prices[station]
-    
     return synthetic_data
 
 
+def station_profits_array(station_profits):
+    """Convert {station_id: profit} into a dense array indexed by integer station id."""
+    station_ids = np.fromiter((int(station) for station in station_profits), dtype=np.int64, count=len(station_profits))
+    profits = np.zeros(station_ids.max() + 1 if len(station_ids) else 0, dtype=np.float64)
+    profits[station_ids] = np.fromiter(station_profits.values(), dtype=np.float64, count=len(station_profits))
+    return profits
+
+
 def get_controlled_profit(station_profits, controlled_stations):
-    """Sum profits of controlled stations only."""
-    return sum(station_profits.get(str(station), 0) for station in controlled_stations)
+    """
+    Sum profits of controlled stations only.
+    station_profits is either an int-keyed dict as returned by solve_routing_station_profits or an array from
+    station_profits_array, which turns the sum into a single integer-indexed reduction (stations without profit count as 0).
+    """
+    if isinstance(station_profits, np.ndarray):
+        station_ids = np.asarray(controlled_stations, dtype=np.int64)
+        return float(station_profits[station_ids[station_ids < len(station_profits)]].sum())
+    return sum(station_profits.get(station, 0) for station in controlled_stations)
 
 
-def solve_routing_and_get_profit(charging_prices, controlled_stations, base_map_file, solver, time_limit, verbose):
-    """Solve routing model with given prices and return profit of controlled stations."""
-    if verbose >= 1:
-        print(f"\nSolving routing model for prices {charging_prices}...")
-        print()
+def fill_routing_prices(solution_prices, controlled_stations, base_case_prices, general_min_price):
+    """
+    Complete an aggregator solution for the routing model: stations left without a price (None) get
+    the minimum price if controlled, or their fixed base case price if they are competitors.
+    """
+    controlled_set = frozenset(controlled_stations)
+    return {
+        station: price if price is not None
+        else general_min_price if station in controlled_set
+        else base_case_prices[station]
+        for station, price in solution_prices.items()
+    }
+
+
+# Station profits of the routing solves done so far in this process, keyed by _routing_cache_key
+_routing_profits_cache = {}
+
+# Map data read from each Excel file in this process; prices are applied to a copy for every solve
+_map_data_templates = {}
+
+# Content digest of each map file, part of the routing cache key
+_map_file_digests = {}
+
+
+def clear_routing_cache():
+    """Forget the routing solves cached in memory by this process (the disk cache is left untouched)."""
+    _routing_profits_cache.clear()
+
+
+def set_map_data_template(base_map_file, map_data):
+    """
+    Register map data already loaded from base_map_file (without price changes) as its template,
+    so routing solves in this process skip reading the Excel file (worker processes read it once each).
+    """
+    _map_data_templates[os.path.abspath(base_map_file)] = map_data
+
+
+def _get_map_data_template(base_map_file):
+    """Read the map Excel file once per process and reuse the loaded data afterwards."""
+    path = os.path.abspath(base_map_file)
+    if path not in _map_data_templates:
+        _map_data_templates[path] = load_excel_map_data(base_map_file, verbose=0)
+    return _map_data_templates[path]
+
+
+def _price_key(charging_prices):
+    """Canonical hashable signature of a price vector."""
+    return tuple(sorted((int(station), None if price is None else round(float(price), 6))
+                        for station, price in charging_prices.items()))
+
+
+def _map_file_digest(base_map_file):
+    """SHA-256 of the map file contents, computed once per process, so editing the workbook invalidates cached solves."""
+    path = os.path.abspath(base_map_file)
+    if path not in _map_file_digests:
+        with open(path, 'rb') as f:
+            _map_file_digests[path] = hashlib.sha256(f.read()).hexdigest()[:16]
+    return _map_file_digests[path]
+
+
+def _routing_cache_key(charging_prices, base_map_file, solver, time_limit):
+    """Key identifying a routing solve: the map, the solver settings and the full price vector."""
+    return (os.path.abspath(base_map_file), _map_file_digest(base_map_file), solver, time_limit,
+            _price_key(charging_prices))
+
+
+def solve_routing_station_profits(charging_prices, base_map_file, solver, time_limit, verbose,
+                                  solver_options=None, cache_dir=None):
+    """
+    Solve routing model with given prices and return the profits of all stations, keyed by integer station id.
+    
+    Results are cached by price vector, in memory and (if cache_dir is given) on disk, so the routing
+    model is solved only once per unique price assignment. The profits of all stations are stored,
+    so combinations controlling different stations reuse the same solve.
+    """
+    key = _routing_cache_key(charging_prices, base_map_file, solver, time_limit)
+    if key in _routing_profits_cache:
+        if verbose >= 2:
+            print(f"→ Reusing routing solution for these prices")
+        return _routing_profits_cache[key]
     
-    map_data = load_excel_map_data(base_map_file, charging_prices=charging_prices, verbose=0)
+    cache_file = None
+    if cache_dir is not None:
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        cache_file = os.path.join(cache_dir, f"routing_{digest}.pkl")
+        if os.path.exists(cache_file):
+            with open(cache_file, 'rb') as f:
+                station_profits = {int(station): profit for station, profit in pickle.load(f).items()}
+            _routing_profits_cache[key] = station_profits
+            if verbose >= 2:
+                print(f"→ Loaded routing solution from cache: {cache_file}")
+            return station_profits
+    
+    map_data = apply_charging_prices(_get_map_data_template(base_map_file), charging_prices, verbose=0)
     results = solve_for_all_evs(
         map_data,
         solver=solver,
         time_limit=time_limit,
         verbose=verbose,
-        linearize_constraints=True
+        linearize_constraints=True,
+        solver_options=solver_options
     )
+    station_profits = results.get("station_profits")
+    
+    # Failed solves are not cached so they are retried
+    if station_profits is not None:
+        # The routing model reports profits by station id as a string
+        station_profits = {int(station): profit for station, profit in station_profits.items()}
+        _routing_profits_cache[key] = station_profits
+        if cache_file is not None:
+            # Write to a temporary file first so parallel workers never read a partial pickle
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(station_profits, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+    
+    return station_profits
+
+
+def solve_routing_and_get_profit(charging_prices, controlled_stations, base_map_file, solver, time_limit, verbose,
+                                 solver_options=None, cache_dir=None):
+    """Solve routing model with given prices and return profit of controlled stations."""
+    if verbose >= 1:
+        print(f"\nSolving routing model for prices {charging_prices}...")
+        print()
+    
+    station_profits = solve_routing_station_profits(charging_prices, base_map_file, solver, time_limit, verbose,
+                                                    solver_options=solver_options, cache_dir=cache_dir)
     
-    if "station_profits" in results and results["station_profits"] is not None:
-        profit = get_controlled_profit(results["station_profits"], controlled_stations)
+    if station_profits is not None:
+        profit = get_controlled_profit(station_profits, controlled_stations)
         if verbose >= 2:
             print(f"→ Routing profit: ${profit:.4f}")
         return profit
@@ -89,10 +217,353 @@ def solve_routing_and_get_profit(charging_prices, controlled_stations, base_map_
     return None
 
 
-def generate_station_combinations(all_stations, min_size, max_size):
-    """Generate all combinations of stations to test."""
+def _combination_positions(n, size):
+    """
+    All size-combinations of range(n) as a (C(n, size), size) int64 array in lexicographic order,
+    built one column at a time: every row is repeated once per valid next position (greater than
+    its last one and leaving room for the remaining columns), without a Python loop over combinations.
+    """
+    positions = np.empty((1, 0), dtype=np.int64)
+    for column in range(size):
+        last = positions[:, -1] if column > 0 else np.full(len(positions), -1, dtype=np.int64)
+        counts = np.maximum(n - (size - column) - last, 0)
+        starts = np.repeat(last + 1, counts)
+        offsets = np.arange(counts.sum(), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+        positions = np.column_stack([np.repeat(positions, counts, axis=0), starts + offsets])
+    return positions
+
+
+def generate_station_combinations(all_stations, min_size, max_size, backend="itertools"):
+    """
+    Generate all combinations of stations to test (as lists of station ids).
+    backend="numpy" enumerates them with vectorized NumPy operations (see _combination_positions)
+    instead of itertools, in the same order.
+    """
+    if backend == "numpy":
+        stations = np.asarray(all_stations, dtype=np.int64)
+        return [combo for size in range(min_size, max_size + 1)
+                for combo in stations[_combination_positions(len(stations), size)].tolist()]
+    
     combinations_to_test = []
     for size in range(min_size, max_size + 1):
         for combo in combinations(all_stations, size):
             combinations_to_test.append(list(combo))
-    return combinations_to_test 
\ No newline at end of file
+    return combinations_to_test
+
+
+def filter_combinations_by_baseline(combinations_to_test, base_case_station_profits, min_baseline_profit, verbose=1):
+    """
+    Keep only the combinations whose stations earn at least min_baseline_profit in the base case
+    (in their original order), printing the skipped ones if verbose >= 1.
+    """
+    kept_combinations = []
+    for combo in combinations_to_test:
+        baseline_profit = get_controlled_profit(base_case_station_profits, combo)
+        if baseline_profit >= min_baseline_profit:
+            kept_combinations.append(combo)
+        elif verbose >= 1:
+            print(f"→ Skipping {combo}: base case profit ${baseline_profit:.2f}")
+    return kept_combinations
+
+
+def prune_combinations_by_surrogate(combinations_to_test, training_data_csv_file, base_case_station_profits,
+                                    general_min_price, general_max_price, topk=None, epsilon=0.0):
+    """
+    Rank combinations by a cheap surrogate of their attainable profit and drop the unpromising ones.
+
+    The surrogate of a combination is the highest total profit of its stations observed in the
+    training data (rows where all of its stations are priced within the price bounds). Combinations
+    whose surrogate does not exceed their base case profit plus epsilon are dropped, and the rest are
+    ranked by descending surrogate and capped at topk (all of them if topk is None). The kept combinations
+    are then returned largest first (the slowest solves first, for load balance in the parallel run),
+    keeping the surrogate order within each size.
+
+    Combinations with a station that has no profit column in the training data are always kept,
+    since the surrogate cannot say anything about them.
+
+    Returns (kept_combinations, kept_surrogates), the surrogate of each kept combination being
+    None when it could not be computed.
+    """
+    training_data = pd.read_csv(training_data_csv_file)
+    profit_columns = [col for col in training_data.columns if col.startswith('profit_')]
+    stations = [int(col[len('profit_'):]) for col in profit_columns]
+    column_of_station = {station: j for j, station in enumerate(stations)}
+    profits = training_data[profit_columns].to_numpy(dtype=np.float64)
+
+    # Rows where each station's price lies within the bounds (stations without a price column are unconstrained)
+    within_bounds = np.ones(profits.shape, dtype=bool)
+    for j, station in enumerate(stations):
+        price_col = f'rc_{station}'
+        if price_col in training_data.columns:
+            prices = training_data[price_col].to_numpy(dtype=np.float64)
+            within_bounds[:, j] = (prices >= general_min_price) & (prices <= general_max_price)
+
+    surrogates = {}
+    ranked = []
+    unranked = []
+    for i, controlled_stations in enumerate(combinations_to_test):
+        columns = [column_of_station.get(int(station)) for station in controlled_stations]
+        if None in columns:
+            surrogates[i] = None
+            unranked.append(i)
+            continue
+        rows = within_bounds[:, columns].all(axis=1)
+        surrogate = float(profits[rows][:, columns].sum(axis=1).max()) if rows.any() else float('-inf')
+        surrogates[i] = surrogate
+        if surrogate > get_controlled_profit(base_case_station_profits, controlled_stations) + epsilon:
+            ranked.append(i)
+
+    ranked.sort(key=lambda i: surrogates[i], reverse=True)
+    if topk is not None:
+        ranked = ranked[:topk]
+    kept = ranked + unranked
+    kept.sort(key=lambda i: len(combinations_to_test[i]), reverse=True)
+    return [combinations_to_test[i] for i in kept], [surrogates[i] for i in kept]
+
+
+def print_combinations(combinations_to_test, max_listed, surrogates=None):
+    """Print the first max_listed combinations (with their surrogate profit, if given) and how many more there are."""
+    for i, combo in enumerate(islice(combinations_to_test, max_listed), 1):
+        if surrogates is None:
+            print(f"    {i:2d}. {combo}")
+        else:
+            surrogate_str = "n/a" if surrogates[i - 1] is None else f"${surrogates[i - 1]:.2f}"
+            print(f"    {i:2d}. {combo} (surrogate profit: {surrogate_str})")
+    if len(combinations_to_test) > max_listed:
+        print(f"    ... and {len(combinations_to_test) - max_listed} more")
+
+
+def compute_algorithm_time_limits(results_csv_file, algorithms, base_time_limit, temperature=1.0,
+                                  ema_alpha=0.2, min_combinations=10, min_time_limit=1.0):
+    """
+    Split the aggregator time budget among algorithms according to how much they improved on past runs.
+
+    The reward of each algorithm is an exponential moving average (weight ema_alpha on the newest value)
+    of its real profit minus the base case profit over the combinations of a previous results CSV.
+    Rewards are standardized (so temperature does not depend on the profit scale) and the total budget
+    base_time_limit * len(algorithms) is shared with softmax(reward / temperature) weights; algorithms
+    whose share falls below min_time_limit get min_time_limit and the rest of the budget is shared among
+    the others, so the total is kept. Once every algorithm has at least min_combinations results,
+    algorithms whose reward is more than two standard deviations below the mean reward are dropped, the
+    standard deviation being that of an EMA of the per-combination improvements of all algorithms
+    (std * sqrt(ema_alpha / (2 - ema_alpha))) rather than the spread of the few per-algorithm rewards.
+    Algorithms without history keep base_time_limit.
+
+    Returns {algorithm: time_limit} for the algorithms to run, in the order of algorithms.
+    """
+    results = pd.read_csv(results_csv_file)
+    base_profits = (results[results['type'] == 'base_case']
+                    .drop_duplicates('controlled_stations')
+                    .set_index('controlled_stations')['profit'])
+
+    rewards = {}
+    counts = {}
+    history = []
+    for alg in algorithms:
+        real = results[results['type'] == f'{alg}_real'].drop_duplicates('controlled_stations')
+        improvements = real['profit'].to_numpy(dtype=np.float64) - base_profits.reindex(real['controlled_stations']).to_numpy(dtype=np.float64)
+        improvements = improvements[~np.isnan(improvements)]
+        if len(improvements) == 0:
+            continue
+        reward = improvements[0]
+        for improvement in improvements[1:]:
+            reward = ema_alpha * improvement + (1 - ema_alpha) * reward
+        rewards[alg] = reward
+        counts[alg] = len(improvements)
+        history.append(improvements)
+
+    # Drop algorithms that consistently lag behind the rest
+    if len(rewards) > 1 and all(counts[alg] >= min_combinations for alg in rewards):
+        reward_values = np.array(list(rewards.values()))
+        reward_std = np.concatenate(history).std() * np.sqrt(ema_alpha / (2 - ema_alpha))
+        threshold = reward_values.mean() - 2 * reward_std
+        rewards = {alg: reward for alg, reward in rewards.items() if reward >= threshold}
+
+    time_limits = {}
+    if rewards:
+        reward_values = np.array(list(rewards.values()))
+        reward_values = reward_values - reward_values.mean()
+        if reward_values.std() > 0:
+            reward_values /= reward_values.std()
+        weights = np.exp(reward_values / temperature - (reward_values / temperature).max())
+        total_time_limit = base_time_limit * len(rewards)
+        
+        # Raise the shares below min_time_limit to it and split what is left among the others
+        floored = np.zeros(len(weights), dtype=bool)
+        while True:
+            remaining_time_limit = max(0.0, total_time_limit - min_time_limit * floored.sum())
+            shares = np.where(floored, min_time_limit, remaining_time_limit * weights / weights[~floored].sum())
+            below = ~floored & (shares < min_time_limit)
+            if not below.any():
+                break
+            floored |= below
+            if floored.all():
+                shares = np.full(len(weights), float(min_time_limit))
+                break
+        for alg, share in zip(rewards, shares):
+            time_limits[alg] = float(share)
+    return {alg: time_limits.get(alg, base_time_limit) for alg in algorithms
+            if alg in time_limits or alg not in counts}
+
+
+def progress_file_path(output_csv_file):
+    """Sidecar file listing (one JSON list per line) the combinations whose rows are saved in output_csv_file."""
+    return os.path.splitext(output_csv_file)[0] + ".progress.jsonl"
+
+
+def resume_results_csv(output_csv_file, expected_columns):
+    """
+    Prepare a results CSV left by an interrupted run to be continued.
+    
+    Reads the finished combinations from its progress file and drops any rows of combinations
+    that were being written when the run stopped, so they can be run again without duplicates.
+    The CSV must have been written with the progress file and with expected_columns as its header,
+    since the new rows are appended to it; otherwise nothing is changed and an error is raised.
+    
+    Returns the set of finished combinations, as their 'controlled_stations' strings.
+    """
+    progress_file = progress_file_path(output_csv_file)
+    if not os.path.exists(progress_file):
+        raise FileNotFoundError(f"Cannot resume {output_csv_file}: its progress file {progress_file} does not exist")
+    
+    with open(output_csv_file, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = list(reader)
+    if header != list(expected_columns):
+        raise ValueError(f"Cannot resume {output_csv_file}: its columns do not match the ones of this experiment")
+    
+    completed = set()
+    with open(progress_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                completed.add("|".join(map(str, json.loads(line))))
+    
+    column = header.index('controlled_stations')
+    kept_rows = [row for row in rows if row[column] in completed]
+    if len(kept_rows) != len(rows):
+        tmp_file = f"{output_csv_file}.tmp"
+        with open(tmp_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(kept_rows)
+        os.replace(tmp_file, output_csv_file)
+    
+    return completed
+
+
+def _run_combination_with_log(run_experiment, controlled_stations, experiment_kwargs, log_file_path):
+    """Run one combination in a worker process, writing its output to its own log file."""
+    with open(log_file_path, 'w', encoding='utf-8') as log_file, contextlib.redirect_stdout(log_file):
+        return run_experiment(controlled_stations=controlled_stations, **experiment_kwargs)
+
+
+def run_combinations_in_parallel(run_experiment, combinations_to_test, experiment_kwargs, max_workers, log_dir):
+    """
+    Run the experiment of every combination of controlled stations in a pool of processes.
+    combinations_to_test can be any iterable of combinations.
+    
+    Each combination is independent, so run_experiment (a module-level function taking
+    controlled_stations plus experiment_kwargs) is submitted once per combination.
+    The output of each combination is written to its own log file in log_dir.
+    
+    Workers are started with 'spawn' rather than forked, so they do not inherit solver state from this
+    process (such as a Gurobi environment started by the base case solve, which is not fork-safe);
+    each worker starts its own.
+    
+    With max_workers=1 the combinations run one after another in the current process instead
+    (e.g. for Gurobi setups whose license allows a single solve at a time).
+    
+    Yields (index, controlled_stations, results, log_file_path) as combinations complete.
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    if max_workers == 1:
+        for i, controlled_stations in enumerate(combinations_to_test):
+            log_file_path = os.path.join(log_dir, f"combination_{i + 1}.txt")
+            results = _run_combination_with_log(run_experiment, controlled_stations, experiment_kwargs, log_file_path)
+            yield i, controlled_stations, results, log_file_path
+        return
+    
+    # Combinations are submitted as workers free up, with at most two per worker queued at a time,
+    # so combinations_to_test can be any iterable and is consumed lazily
+    max_in_flight = 2 * max_workers
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {}
+        for i, controlled_stations in enumerate(combinations_to_test):
+            if len(futures) >= max_in_flight:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    done_i, done_stations, done_log_file_path = futures.pop(future)
+                    yield done_i, done_stations, future.result(), done_log_file_path
+            log_file_path = os.path.join(log_dir, f"combination_{i + 1}.txt")
+            future = executor.submit(_run_combination_with_log, run_experiment, controlled_stations,
+                                     experiment_kwargs, log_file_path)
+            futures[future] = (i, controlled_stations, log_file_path)
+        
+        for future in as_completed(futures):
+            i, controlled_stations, log_file_path = futures[future]
+            yield i, controlled_stations, future.result(), log_file_path
+
+
+def stream_combination_results(run_experiment, combinations_to_test, experiment_kwargs, max_workers, log_dir,
+                               output_csv_file, fieldnames, append=False):
+    """
+    Run every combination with run_combinations_in_parallel and stream its result rows to output_csv_file.
+    
+    Rows are written as combinations complete, in combination order, and each combination is recorded
+    in the progress file (see progress_file_path) once its rows are safely on disk, so an interrupted
+    run can be continued with resume_results_csv. With append=True the rows are added to an existing
+    CSV (which already has its header) instead of starting a new one.
+    
+    combinations_to_test can be any iterable, as in run_combinations_in_parallel; the progress messages
+    include the total number of combinations when it has a length.
+    The output of each combination is copied from its log file in log_dir to stdout.
+    
+    Returns the number of rows written.
+    """
+    # Results that finish early wait in pending_results until all earlier combinations are written
+    pending_results = {}
+    next_to_write = 0
+    rows_written = 0
+    completed = 0
+    num_combinations = len(combinations_to_test) if hasattr(combinations_to_test, '__len__') else None
+    
+    mode = 'a' if append else 'w'
+    with open(output_csv_file, mode, newline='', encoding='utf-8') as csv_file, \
+            open(progress_file_path(output_csv_file), mode, encoding='utf-8') as progress_file:
+        writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+        if not append:
+            writer.writeheader()
+        
+        for i, controlled_stations, combo_results, combination_log_path in run_combinations_in_parallel(
+                run_experiment, combinations_to_test, experiment_kwargs,
+                max_workers=max_workers, log_dir=log_dir):
+            completed += 1
+            total_str = "" if num_combinations is None else f"/{num_combinations}"
+            print(f"\nPROGRESS: Combination {i+1}{total_str} - {controlled_stations}")
+            if num_combinations is not None:
+                print(f"Remaining: {num_combinations - completed} combinations")
+            
+            # Copy the worker's output into the main log and remove its temporary log file
+            with open(combination_log_path, 'r', encoding='utf-8') as combination_log:
+                print(combination_log.read(), end="")
+            os.remove(combination_log_path)
+            
+            pending_results[i] = (controlled_stations, combo_results)
+            finished = []
+            while next_to_write in pending_results:
+                combo, combo_rows = pending_results.pop(next_to_write)
+                writer.writerows(combo_rows)
+                rows_written += len(combo_rows)
+                finished.append(combo)
+                next_to_write += 1
+            # Make the rows durable before recording their combinations as finished
+            csv_file.flush()
+            os.fsync(csv_file.fileno())
+            for combo in finished:
+                progress_file.write(json.dumps(combo) + "\n")
+            progress_file.flush()
+            print(f"✓ Completed combination {i+1}{total_str}")
+    
+    os.rmdir(log_dir)
+    return rows_written
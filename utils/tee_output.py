@@ -2,11 +2,17 @@ import sys
 
 
 class TeeOutput:
-    """Class to write output to both console and file simultaneously."""
+    """Class to write output to both console and file simultaneously.
 
-    def __init__(self, file_path):
+    The log file is buffered and flushed every ``flush_every_lines`` lines (and on
+    ``flush``/``close``, or when leaving a ``with`` block) instead of after every write.
+    """
+
+    def __init__(self, file_path, flush_every_lines=100):
         self.terminal = sys.stdout
         self.log_file = None
+        self.flush_every_lines = flush_every_lines
+        self._pending_lines = 0
         if file_path is not None:
             self.log_file = open(file_path, 'w', encoding='utf-8')
 
@@ -14,14 +20,24 @@ class TeeOutput:
         self.terminal.write(message)
         if self.log_file:
             self.log_file.write(message)
-            self.log_file.flush()  # Ensure immediate writing to file
+            self._pending_lines += message.count('\n')
+            if self._pending_lines >= self.flush_every_lines:
+                self.log_file.flush()
+                self._pending_lines = 0
 
     def flush(self):
         self.terminal.flush()
         if self.log_file:
             self.log_file.flush()
+            self._pending_lines = 0
 
     def close(self):
         if self.log_file:
             self.log_file.close()
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+        self.close()